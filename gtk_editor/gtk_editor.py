@@ -18,6 +18,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import math
 
 from graph_tool import *
 from graph_tool.stats import label_parallel_edges, remove_labeled_edges
@@ -28,6 +29,13 @@ from graph_tool.draw.gtk_draw import VertexMatrix
 from graph_tool.draw.cairo_draw import *
 from graph_tool.draw.cairo_draw import _vdefaults, _edefaults
 
+from gi.repository import Gio, GLib
+
+# 14x14 checkerboard tile in ARGB32, surfaces are created for this buffer, hence kept at module level
+_checkerboard = np.full((14, 14, 4), 153, dtype=np.uint8)
+_checkerboard[:7, :7] = _checkerboard[7:, 7:] = 102
+_checkerboard[..., 3] = 255
+
 
 class GraphEditorWindow(Gtk.Window):
     r"""Interactive GTK+ window containing a :class:`~Gtk.Notebook` that has
@@ -83,13 +91,56 @@ class GraphEditorWindow(Gtk.Window):
             self.pack_end(self.close_btn, expand=False, fill=False, padding=0)
             self.show_all()
 
+    _ICON_DIR = os.path.dirname(__file__)
+    _LOGO_DIR = os.path.dirname(gtk_draw.__file__)
+    # shared by every window, keyed by (directory, name, width, height)
+    _icon_cache = {}
+    _icon_callbacks = {}
+
+    @classmethod
+    def _load_icon(cls, callback, name, width=-1, height=-1, directory=None):
+        r"""Calls ``callback`` with icon ``name`` at the given size. Icon is read and rasterized
+        asynchronously the first time only, callbacks asking for it meanwhile are queued."""
+        directory = cls._ICON_DIR if directory is None else directory
+        key = (directory, name, width, height)
+        if key in cls._icon_cache:
+            callback(cls._icon_cache[key])
+        elif key in cls._icon_callbacks:
+            cls._icon_callbacks[key].append(callback)
+        else:
+            cls._icon_callbacks[key] = [callback]
+
+            def failed(error):
+                # placeholders are left as they are, a later call retries
+                print("Couldn't load icon '%s': %s" % (name, error.message), file=sys.stderr)
+                cls._icon_callbacks.pop(key, None)
+
+            def pixbuf_loaded(stream, result):
+                try:
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_stream_finish(result)
+                except GLib.Error as error:
+                    failed(error)
+                    return
+                finally:
+                    stream.close()
+                cls._icon_cache[key] = pixbuf
+                for queued in cls._icon_callbacks.pop(key):
+                    queued(pixbuf)
+
+            def file_read(file, result):
+                try:
+                    stream = file.read_finish(result)
+                except GLib.Error as error:
+                    failed(error)
+                    return
+                GdkPixbuf.Pixbuf.new_from_stream_at_scale_async(stream, width, height, True, None, pixbuf_loaded)
+
+            Gio.File.new_for_path(os.path.join(directory, name)).read_async(GLib.PRIORITY_DEFAULT, None, file_read)
+
     def __init__(self, geometry, title):
         print("===> " + title + " <===", file=sys.stderr)
         Gtk.Window.__init__(self, title=title)
-        icon = GdkPixbuf.Pixbuf.new_from_file('%s/graph-tool-logo.svg' %
-                                              os.path.dirname(gtk_draw.__file__))
-        # IDEA: os.path.join(os.path.dirname(gtk_draw.__file__), 'graph-tool-logo.svg')
-        self.set_icon(icon)
+        GraphEditorWindow._load_icon(self.set_icon, 'graph-tool-logo.svg', directory=GraphEditorWindow._LOGO_DIR)
         self.set_default_size(geometry[0], geometry[1])
 
         self._mode = GraphEditorWidget.modes.select
@@ -117,6 +168,17 @@ class GraphEditorWindow(Gtk.Window):
         self.edge_store = None
         self.selected_vertices_filter = None
         self.selected_edges_filter = None
+        # index -> TreeIter of store rows
+        self._vertex_iters = {}
+        self._edge_iters = {}
+        # label properties of current tab
+        self._vertex_text = None
+        self._edge_text = None
+        # selection and preselection packed as bit lanes, selected lane is as written into stores
+        self._vertex_state = None
+        self._edge_state = None
+        # kind of picked ('v', 'e' or None) the tree view models are set up for
+        self._current_selected_kind = None
 
         # setup left sidebar
         self.selected_tree_view = Gtk.TreeView()
@@ -137,10 +199,10 @@ class GraphEditorWindow(Gtk.Window):
         remove_cell.connect("toggled", self.preselect_to_remove_event)
 
         index_column = Gtk.TreeViewColumn("#", Gtk.CellRendererText(), text=0)
-        label_column = Gtk.TreeViewColumn("Label", label_cell)
-        remove_column = Gtk.TreeViewColumn("", remove_cell, active=1)
+        label_column = Gtk.TreeViewColumn("Label", label_cell, text=2)
+        remove_column = Gtk.TreeViewColumn("", remove_cell)
 
-        label_column.set_cell_data_func(label_cell, self._render_label_cell)
+        remove_column.set_cell_data_func(remove_cell, self._render_toggle_cell)
         label_column.set_expand(True)
         remove_column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
         remove_column.set_fixed_width(20)
@@ -167,10 +229,10 @@ class GraphEditorWindow(Gtk.Window):
         select_cell.connect("toggled", self.preselect_to_select_event)
 
         index_column = Gtk.TreeViewColumn("#", Gtk.CellRendererText(), text=0)
-        label_column = Gtk.TreeViewColumn("Label", label_cell)
-        select_column = Gtk.TreeViewColumn("", select_cell, active=1)
+        label_column = Gtk.TreeViewColumn("Label", label_cell, text=2)
+        select_column = Gtk.TreeViewColumn("", select_cell)
 
-        label_column.set_cell_data_func(label_cell, self._render_label_cell)
+        select_column.set_cell_data_func(select_cell, self._render_toggle_cell)
         label_column.set_expand(True)
         select_column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
         select_column.set_fixed_width(20)
@@ -220,14 +282,13 @@ class GraphEditorWindow(Gtk.Window):
 
         icon = Gdk.Cursor(Gdk.CursorType.ARROW).get_image()
         select_mode_btn.set_icon_widget(Gtk.Image.new_from_pixbuf(icon))
-        icon = GdkPixbuf.Pixbuf.new_from_file_at_size('%s/place-node.svg' % os.path.dirname(__file__),
-                                                      icon_width, icon_height)
-        # IDEA: os.path.join(os.path.dirname(__file__), 'place-node.svg')
-        place_node_mode_btn.set_icon_widget(Gtk.Image.new_from_pixbuf(icon))
-        icon = GdkPixbuf.Pixbuf.new_from_file_at_size('%s/place-edge.svg' % os.path.dirname(__file__),
-                                                      icon_width, icon_height)
-        # IDEA: os.path.join(os.path.dirname(__file__), 'place-edge.svg')
-        place_edge_mode_btn.set_icon_widget(Gtk.Image.new_from_pixbuf(icon))
+        # images are filled in once icons get loaded
+        image = Gtk.Image()
+        GraphEditorWindow._load_icon(image.set_from_pixbuf, 'place-node.svg', icon_width, icon_height)
+        place_node_mode_btn.set_icon_widget(image)
+        image = Gtk.Image()
+        GraphEditorWindow._load_icon(image.set_from_pixbuf, 'place-edge.svg', icon_width, icon_height)
+        place_edge_mode_btn.set_icon_widget(image)
 
         select_mode_btn.set_tooltip_text("Select and move")
         place_node_mode_btn.set_tooltip_text("Place nodes")
@@ -325,35 +386,48 @@ class GraphEditorWindow(Gtk.Window):
         g.save(file_name)
 
     @staticmethod
-    def _vertex_from_cell(i, g):
-        try:
-            return g.vertex(i)
-        except ValueError:
-            return None
+    def _vertex_from_cell(i, tab):
+        return tab._vertex_by_index.get(i)
 
     @staticmethod
-    def _edge_from_cell(source, target, index, g):
-        return next((edge for edge in g.edge(source, target, all_edges=True)
-                     if g.edge_index[edge] == index), None)
+    def _edge_from_cell(index, tab):
+        return tab._edge_by_index.get(index)
+
+    # bit lanes of packed state
+    _SELECTED = 1
+    _PRESELECTED = 2
 
     @staticmethod
-    def _is_vertex_selected(model, tree_iter, tab):
-        i, = model.get(tree_iter, 0)
-        vertex = GraphEditorWindow._vertex_from_cell(i, tab.g)
-        return tab.selected_vertices[vertex]
+    def _pack_state(selected, preselected):
+        r"""Packs ``selected`` and ``preselected`` property maps into bit lanes of one array."""
+        state = np.array(selected.a, dtype=np.uint8)
+        if preselected is not None:
+            state |= preselected.a.astype(np.uint8) << 1
+        return state
 
     @staticmethod
-    def _is_edge_selected(model, tree_iter, tab):
-        i, s, t = model.get(tree_iter, 0, 2, 3)
-        edge = GraphEditorWindow._edge_from_cell(s, t, i, tab.g)
-        return tab.selected_edges[edge]
+    def _all_preselected(state):
+        # preselection is always a subset of selection
+        return not (state == GraphEditorWindow._SELECTED).any()
+
+    @staticmethod
+    def _sync_selected_column(store, iters, state, synced):
+        r"""Writes selected lane of ``state`` into the visible column of ``store`` only for rows
+        differing from ``synced``, the packed state the column was written from."""
+        changed = state.copy()
+        n = min(len(state), len(synced))
+        changed[:n] ^= synced[:n]
+        for i in np.flatnonzero(changed & GraphEditorWindow._SELECTED):
+            tree_iter = iters.get(int(i))
+            if tree_iter is not None:
+                store.set_value(tree_iter, 1, bool(state[i] & GraphEditorWindow._SELECTED))
 
     def _save_tab(self, target_tab):
         if target_tab.file_name is None:
             target_tab.file_name = self._pick_file_dialog(save=True)
         if target_tab.file_name is not None:
             GraphEditorWindow._save_graph(target_tab.g, target_tab.pos, target_tab.file_name)
-            target_tab.emit("graph-changed", False)
+            target_tab.emit("graph-changed", False, [])
 
     def _close_tab(self, target_tab):
         if target_tab.is_changed():
@@ -370,46 +444,59 @@ class GraphEditorWindow(Gtk.Window):
             return False
         return True
 
+    def _preselected_of(self, model, tab):
+        if model is self.selected_vertices_filter:
+            return tab.preselected_vertices
+        elif model is self.selected_edges_filter:
+            return tab.preselected_edges
+        return None
+
     def _preselect(self, cell, path, model):
         tab = self.get_current_tab()
-        # tree_iter = model.get_iter(Gtk.TreePath.new_from_string(path))
-        # model.set_value(tree_iter, 1, not cell.get_active())
-        model[path][1] = not cell.get_active()
-        if model == self.selected_vertices_filter:
-            # i, to = model.get(tree_iter, 0, 1)
-            i, to = model[path]
+        tree_iter = model.get_iter(path)
+        i, = model.get(tree_iter, 0)
+        preselected = self._preselected_of(model, tab)
+        to = preselected is None or not preselected.a[i]
+        if model is self.selected_vertices_filter:
             if tab.preselected_vertices is None:
                 tab.preselected_vertices = tab.g.new_vertex_property("bool", False)
-            tab.preselected_vertices[GraphEditorWindow._vertex_from_cell(i, tab.g)] = to
-            if not any(tab.preselected_vertices.fa):
+            tab.preselected_vertices[GraphEditorWindow._vertex_from_cell(i, tab)] = to
+            # only unchecking may leave it empty
+            if not to and not tab.preselected_vertices.fa.any():
                 tab.preselected_vertices = None
-        elif model == self.selected_edges_filter:
-            # i, to, s, t = model.get(tree_iter, 0, 1, 2, 3)
-            i, to, s, t = model[path]
+        elif model is self.selected_edges_filter:
             if tab.preselected_edges is None:
                 tab.preselected_edges = tab.g.new_edge_property("bool", False)
-            tab.preselected_edges[GraphEditorWindow._edge_from_cell(s, t, i, tab.g)] = to
-            if not any(tab.preselected_edges.fa):
+            tab.preselected_edges[GraphEditorWindow._edge_from_cell(i, tab)] = to
+            if not to and not tab.preselected_edges.fa.any():
                 tab.preselected_edges = None
-        tab.queue_draw()
+        # checkbox state is read from preselection, only its row needs repaint
+        model.row_changed(path, tree_iter)
+        tab.invalidate_overlay()
 
     def _preselect_all(self, model, to):
         tab = self.get_current_tab()
 
-        for row in model:
-            model[row.path][1] = to
-
         if to:
-            if model == self.selected_vertices_filter:
-                tab.preselected_vertices = tab.selected_vertices.copy()
-            elif model == self.selected_edges_filter:
-                tab.preselected_edges = tab.selected_edges.copy()
+            # reuse allocated preselection
+            if model is self.selected_vertices_filter:
+                if tab.preselected_vertices is None:
+                    tab.preselected_vertices = tab.selected_vertices.copy()
+                else:
+                    tab.preselected_vertices.a = tab.selected_vertices.a
+            elif model is self.selected_edges_filter:
+                if tab.preselected_edges is None:
+                    tab.preselected_edges = tab.selected_edges.copy()
+                else:
+                    tab.preselected_edges.a = tab.selected_edges.a
         else:
-            if model == self.selected_vertices_filter:
+            if model is self.selected_vertices_filter:
                 tab.preselected_vertices = None
-            elif model == self.selected_edges_filter:
+            elif model is self.selected_edges_filter:
                 tab.preselected_edges = None
-        tab.queue_draw()
+        self.selected_tree_view.queue_draw()
+        self.connected_tree_view.queue_draw()
+        tab.invalidate_overlay()
 
     def _pick_file_dialog(self, save=False):
         dialog = Gtk.FileChooserDialog("Please choose a file", self,
@@ -464,25 +551,45 @@ class GraphEditorWindow(Gtk.Window):
         dialog.destroy()
         return answer
 
-    def _render_label_cell(self, column, cell, model, tree_iter, data=None):
-        tab = self.get_current_tab()
-        txt = None
-        if model == self.selected_vertices_filter:
-            i, = model.get(tree_iter, 0)
-            vertex = GraphEditorWindow._vertex_from_cell(i, tab.g)
-            if vertex is not None:
-                txt = tab.vprops["text"][vertex] if "text" in tab.vprops else ""
-        elif model == self.selected_edges_filter:
-            i, s, t = model.get(tree_iter, 0, 2, 3)
-            edge = GraphEditorWindow._edge_from_cell(s, t, i, tab.g)
-            if edge is not None:
-                if "text" in tab.eprops:
-                    txt = tab.eprops["text"][edge]
-                if not txt:  # None or ""
-                    txt = "(%d -> %d)" % (s, t)
-        if txt is None:
-            txt = "not found"
-        cell.set_property("text", txt)
+    # labels are formatted once per row, tree views bind them as text
+    def _vertex_label(self, tab, i):
+        if self._vertex_text is None:
+            return ""
+        return self._vertex_text[tab._vertex_by_index[i]]
+
+    def _edge_label(self, tab, i, source, target):
+        txt = self._edge_text[tab._edge_by_index[i]] if self._edge_text is not None else None
+        return txt or "(%d -> %d)" % (source, target)
+
+    # insert_with_valuesv skips TreeModel._convert_value of append,
+    # plain ints and bools spare GValue introspection
+    def _insert_vertex_row(self, i, label, selected=False):
+        self._vertex_iters[i] = self.vertex_store.insert_with_valuesv(-1, [0, 1, 2], [i, selected, label])
+
+    def _insert_edge_row(self, i, label, selected=False):
+        self._edge_iters[i] = self.edge_store.insert_with_valuesv(-1, [0, 1, 2], [i, selected, label])
+
+    def _update_stores(self, tab, delta):
+        for op, kind, i in delta:
+            if op == "add":
+                if kind == "v":
+                    self._insert_vertex_row(i, self._vertex_label(tab, i))
+                else:
+                    edge = tab._edge_by_index[i]
+                    self._insert_edge_row(i, self._edge_label(tab, i, int(edge.source()), int(edge.target())))
+            elif op == "remove":
+                # index may be reused by a new element, inserted as not selected
+                if kind == "v":
+                    self.vertex_store.remove(self._vertex_iters.pop(i))
+                    self._vertex_state[i:i + 1] = 0
+                else:
+                    self.edge_store.remove(self._edge_iters.pop(i))
+                    self._edge_state[i:i + 1] = 0
+
+    def _render_toggle_cell(self, column, cell, model, tree_iter, data=None):
+        preselected = self._preselected_of(model, self.get_current_tab())
+        i, = model.get(tree_iter, 0)
+        cell.set_property("active", preselected is not None and bool(preselected.a[i]))
 
     def new_tab_event(self, widget):
         r"""Handles opening a new empty tab."""
@@ -517,88 +624,104 @@ class GraphEditorWindow(Gtk.Window):
 
     def page_changed_event(self, widget, tab, n):
         r"""Handles `switch-page` event."""
-        self.vertex_store = Gtk.ListStore(int, bool)
-        self.edge_store = Gtk.ListStore(int, bool, int, int)
-
-        for vertex in tab.g.vertices():
-            self.vertex_store.append([tab.g.vertex_index[vertex],
-                                      False if tab.preselected_vertices is None else
-                                      tab.preselected_vertices[vertex]])
-        for edge in tab.g.edges():
-            self.edge_store.append([tab.g.edge_index[edge],
-                                    False if tab.preselected_edges is None else
-                                    tab.preselected_edges[edge],
-                                    edge.source(),
-                                    edge.target()])
+        # detach old filters, so views won't react to each row being inserted
+        self.selected_tree_view.set_model(None)
+        self.connected_tree_view.set_model(None)
+        self._current_selected_kind = None
+
+        # second column tells whether element is selected, filters show those rows only
+        # third one is the label, checkboxes are rendered from tab.preselected_vertices and tab.preselected_edges
+        self.vertex_store = Gtk.ListStore(int, bool, str)
+        self.edge_store = Gtk.ListStore(int, bool, str)
+
+        self._vertex_iters = {}
+        self._edge_iters = {}
+        self._vertex_text = tab.vprops.get("text")
+        self._edge_text = tab.eprops.get("text")
+        self._vertex_state = GraphEditorWindow._pack_state(tab.selected_vertices, tab.preselected_vertices)
+        self._edge_state = GraphEditorWindow._pack_state(tab.selected_edges, tab.preselected_edges)
+        selected_vertices = self._vertex_state & GraphEditorWindow._SELECTED
+        selected_edges = self._edge_state & GraphEditorWindow._SELECTED
+        # arrays of indices spare iterating over descriptors
+        for i in tab.g.get_vertices():
+            i = int(i)
+            self._insert_vertex_row(i, self._vertex_label(tab, i), bool(selected_vertices[i]))
+        for source, target, i in tab.g.get_edges([tab.g.edge_index]).tolist():
+            self._insert_edge_row(i, self._edge_label(tab, i, source, target), bool(selected_edges[i]))
 
         self.selected_vertices_filter = self.vertex_store.filter_new()
         self.selected_edges_filter = self.edge_store.filter_new()
 
-        self.selected_vertices_filter.set_visible_func(GraphEditorWindow._is_vertex_selected, tab)
-        self.selected_edges_filter.set_visible_func(GraphEditorWindow._is_edge_selected, tab)
+        # visibility is evaluated by GTK, no python callback per row
+        self.selected_vertices_filter.set_visible_column(1)
+        self.selected_edges_filter.set_visible_column(1)
 
         self.picked_change_event(tab)
 
-    def graph_changed_event(self, tab, state, notebook):
-        r"""Handles `graph-changed` event."""
+    def graph_changed_event(self, tab, state, delta, notebook):
+        r"""Handles `graph-changed` event. Stores are rebuilt only if ``delta`` is ``None``,
+        otherwise just the rows of changed vertices and edges are updated."""
         header = notebook.get_tab_label(tab)
         if state:
             header.label.set_markup("<span color='red'>%s</span>" % header.label.get_text())
-            self.page_changed_event(notebook, tab, notebook.page_num(tab))
+            if delta is None:
+                # other tabs get their stores rebuilt on `switch-page`
+                if tab is self.get_current_tab():
+                    self.page_changed_event(notebook, tab, notebook.page_num(tab))
+            elif delta and tab is self.get_current_tab():
+                # other tabs get their stores rebuilt on `switch-page`
+                self._update_stores(tab, delta)
+                self.picked_change_event(tab)
         else:
             header.label.set_markup(header.label.get_text())
 
     def picked_change_event(self, tab):
         r"""Handles `picked-changed` event."""
+        # preselection is already trimmed to selection by tab
+        # filters follow changes of the visible column, no refilter needed
+        vertex_state = GraphEditorWindow._pack_state(tab.selected_vertices, tab.preselected_vertices)
+        edge_state = GraphEditorWindow._pack_state(tab.selected_edges, tab.preselected_edges)
+        GraphEditorWindow._sync_selected_column(self.vertex_store, self._vertex_iters,
+                                                vertex_state, self._vertex_state)
+        GraphEditorWindow._sync_selected_column(self.edge_store, self._edge_iters,
+                                                edge_state, self._edge_state)
+        self._vertex_state = vertex_state
+        self._edge_state = edge_state
         if tab.picked is None:
-            self.selected_tree_view.set_model(None)
-            self.connected_tree_view.set_model(None)
+            # nothing is selected, filters hide every row, models may stay attached
+            return
+        elif (isinstance(tab.picked, Vertex) or
+              (isinstance(tab.picked, PropertyMap) and tab.picked.key_type() == 'v')):
+            kind = 'v'
+            all_select_set = GraphEditorWindow._all_preselected(edge_state)
+            all_remove_set = GraphEditorWindow._all_preselected(vertex_state)
+        elif (isinstance(tab.picked, Edge) or
+                (isinstance(tab.picked, PropertyMap) and tab.picked.key_type() == 'e')):
+            kind = 'e'
+            all_select_set = GraphEditorWindow._all_preselected(vertex_state)
+            all_remove_set = GraphEditorWindow._all_preselected(edge_state)
         else:
-            # keep stores persistent
-            for row in self.vertex_store:
-                i, = self.vertex_store.get(row.iter, 0)
-                vertex = GraphEditorWindow._vertex_from_cell(i, tab.g)
-                if tab.preselected_vertices is None or not tab.preselected_vertices[vertex]:
-                    self.vertex_store[row.path][1] = False
-
-            for row in self.edge_store:
-                i, s, t = self.edge_store.get(row.iter, 0, 2, 3)
-                edge = GraphEditorWindow._edge_from_cell(s, t, i, tab.g)
-                if tab.preselected_edges is None or not tab.preselected_edges[edge]:
-                    self.edge_store[row.path][1] = False
-
-            self.selected_vertices_filter.refilter()
-            self.selected_edges_filter.refilter()
-            if tab.picked is None:
-                all_select_set = False
-                all_remove_set = False
-            elif (isinstance(tab.picked, Vertex) or
-                  (isinstance(tab.picked, PropertyMap) and tab.picked.key_type() == 'v')):
-                all_select_set = all(row[1] for row in self.selected_edges_filter)
-                all_remove_set = all(row[1] for row in self.selected_vertices_filter)
-                if self.selected_tree_view.get_model() != self.selected_vertices_filter:
-                    self.selected_tree_view.set_model(self.selected_vertices_filter)
-                if self.connected_tree_view.get_model() != self.selected_edges_filter:
-                    self.connected_tree_view.set_model(self.selected_edges_filter)
-            elif (isinstance(tab.picked, Edge) or
-                    (isinstance(tab.picked, PropertyMap) and tab.picked.key_type() == 'e')):
-                all_select_set = all(row[1] for row in self.selected_vertices_filter)
-                all_remove_set = all(row[1] for row in self.selected_edges_filter)
-                if self.selected_tree_view.get_model() != self.selected_edges_filter:
-                    self.selected_tree_view.set_model(self.selected_edges_filter)
-                if self.connected_tree_view.get_model() != self.selected_vertices_filter:
-                    self.connected_tree_view.set_model(self.selected_vertices_filter)
+            # things just got awkward...
+            kind = self._current_selected_kind
+            all_select_set = self._select_all_select_check_btn.get_active()
+            all_remove_set = self._select_all_remove_check_btn.get_active()
+
+        # setting a model re-realizes the tree view, only swap if kind changes
+        if kind != self._current_selected_kind:
+            self._current_selected_kind = kind
+            if kind == 'v':
+                self.selected_tree_view.set_model(self.selected_vertices_filter)
+                self.connected_tree_view.set_model(self.selected_edges_filter)
             else:
-                # things just got awkward...
-                all_select_set = self._select_all_select_check_btn.get_active()
-                all_remove_set = self._select_all_remove_check_btn.get_active()
+                self.selected_tree_view.set_model(self.selected_edges_filter)
+                self.connected_tree_view.set_model(self.selected_vertices_filter)
 
-            if all_select_set != self._select_all_select_check_btn.get_active():
-                self._allow_select_all_select = False
-                self._select_all_select_check_btn.set_active(all_select_set)
-            if all_remove_set != self._select_all_remove_check_btn.get_active():
-                self._allow_select_all_remove = False
-                self._select_all_remove_check_btn.set_active(False)
+        if all_select_set != self._select_all_select_check_btn.get_active():
+            self._allow_select_all_select = False
+            self._select_all_select_check_btn.set_active(all_select_set)
+        if all_remove_set != self._select_all_remove_check_btn.get_active():
+            self._allow_select_all_remove = False
+            self._select_all_remove_check_btn.set_active(False)
 
     def preselect_to_remove_event(self, cell, path):
         r"""Sets vertex or edge corresponding to ``cell`` in
@@ -646,28 +769,29 @@ class GraphEditorWindow(Gtk.Window):
         tab = self.get_current_tab()
         model, tree_iter = tree_selection.get_selected()
         if tree_iter is not None:
-            if model == self.selected_vertices_filter:
+            if model is self.selected_vertices_filter:
                 i, = model.get(tree_iter, 0)
-                tab.prepicked = GraphEditorWindow._vertex_from_cell(i, tab.g)
-            elif model == self.selected_edges_filter:
-                i, s, t = model.get(tree_iter, 0, 2, 3)
-                tab.prepicked = GraphEditorWindow._edge_from_cell(s, t, i, tab.g)
+                tab.prepicked = GraphEditorWindow._vertex_from_cell(i, tab)
+            elif model is self.selected_edges_filter:
+                i, = model.get(tree_iter, 0)
+                tab.prepicked = GraphEditorWindow._edge_from_cell(i, tab)
         else:
             tab.prepicked = None
-        tab.queue_draw()
+        tab.invalidate_overlay()
 
     def select_event(self, widget):
         r"""Changes selection to preselection."""
         tab = self.get_current_tab()
         model = self.connected_tree_view.get_model()
-        if model == self.selected_vertices_filter and tab.preselected_vertices is not None:
-            tab.picked = tab.preselected_vertices.copy()
-            tab.selected_vertices = tab.preselected_vertices.copy()
+        if model is self.selected_vertices_filter and tab.preselected_vertices is not None:
+            # selection is overwritten in place and picked aliases it, as done by tab
+            tab.selected_vertices.fa = tab.preselected_vertices.fa
+            tab.picked = tab.selected_vertices
             tab.preselected_vertices = None
             tab.emit("picked-changed")
-        elif model == self.selected_edges_filter and tab.preselected_edges is not None:
-            tab.picked = tab.preselected_edges.copy()
-            tab.selected_edges = tab.preselected_edges.copy()
+        elif model is self.selected_edges_filter and tab.preselected_edges is not None:
+            tab.selected_edges.fa = tab.preselected_edges.fa
+            tab.picked = tab.selected_edges
             tab.preselected_edges = None
             tab.emit("picked-changed")
 
@@ -676,33 +800,37 @@ class GraphEditorWindow(Gtk.Window):
         # TODO: update selected
         tab = self.get_current_tab()
         model = self.selected_tree_view.get_model()
-        if model == self.selected_vertices_filter:
+        # preselection is a subset of selection, hence of rows shown
+        if model is self.selected_vertices_filter:
             remove = []
-            reinit_vertex_matrix = False
-            for row in model:
-                if model[row.path][1]:
-                    # tree_iter = model.get_iter(row.path)
-                    # i, = model.get(tree_iter, 0)
-                    i = model[row.path][0]
-                    vertex = GraphEditorWindow._vertex_from_cell(i, tab.g)
-                    if not reinit_vertex_matrix and tab.vertex_matrix is not None:
-                        reinit_vertex_matrix = True
-                    remove.append(vertex)
-
-            # XXX: vertex properties are not trimmed when last vertex is included
-            # XXX: removing non-continuous list of vertices while last one is included messes up vertex properties
-            tab.g.remove_vertex(remove)
-            if reinit_vertex_matrix:
+            if tab.preselected_vertices is not None:
+                remove = [GraphEditorWindow._vertex_from_cell(int(i), tab)
+                          for i in np.flatnonzero(tab.preselected_vertices.a)]
+
+            # fast removal swaps last vertices into place of removed ones in a single pass, their property
+            # values move along, but vertex indices change, so nothing may keep indices across it
+            tab.g.remove_vertex(remove, fast=True)
+            if remove and tab.vertex_matrix is not None:
                 tab.init_vertex_matrix()
-        elif model == self.selected_edges_filter:
-            for row in model:
-                if model[row.path][1]:
-                    # tree_iter = model.get_iter(row.path)
-                    # i, s, t = model.get(tree_iter, 0, 2, 3)
-                    i, _, s, t = model[row.path]
-                    # XXX: removing an edge having both source and target the same as another messes up edge properties
-                    tab.g.remove_edge(GraphEditorWindow._edge_from_cell(s, t, i, tab.g))
-        tab.emit("graph-changed", True)
+            # vertices got renumbered
+            tab.emit("graph-changed", True, None)
+            if remove:
+                # descriptors may point at swapped in vertices by now
+                tab.picked = None
+                tab.prepicked = None
+                tab.emit("picked-changed")
+        elif model is self.selected_edges_filter:
+            delta = []
+            if tab.preselected_edges is not None:
+                # indices of removed edges are not in use
+                remove = [int(i) for i in np.flatnonzero(tab.preselected_edges.a)
+                          if GraphEditorWindow._edge_from_cell(int(i), tab) is not None]
+                marked = tab.g.new_edge_property("bool", False)
+                marked.a[remove] = True
+                # XXX: removing an edge having both source and target the same as another messes up edge properties
+                remove_labeled_edges(tab.g, marked)
+                delta = [("remove", "e", i) for i in remove]
+            tab.emit("graph-changed", True, delta)
 
     def cleanup(self):
         r"""Closes each tab. If it's changed saves it."""
@@ -737,7 +865,8 @@ class GraphEditorWindow(Gtk.Window):
         pos = g.new_vertex_property("vector<double>")
         self.add_new_tab(g, pos)
 
-    def add_new_tab(self, g, pos, file_name=None):
+    def add_new_tab(self, g, pos, file_name=None, switch=True):
+        r"""Adds a new tab showing ``g`` and returns it. Current page is left as it is unless ``switch``."""
         if pos is None or not all(pos):
             pos = sfdp_layout(g, pos=pos)
 
@@ -751,9 +880,11 @@ class GraphEditorWindow(Gtk.Window):
         tab.show()
 
         self.notebook.prepend_page(tab, header)
-        self.notebook.set_current_page(self.notebook.page_num(tab))
-        self.notebook.set_focus_child(tab)
+        if switch:
+            self.notebook.set_current_page(self.notebook.page_num(tab))
+            self.notebook.set_focus_child(tab)
         # self.notebook.get_tab_label(tab) returns header
+        return tab
 
     def load_graph_in_new_tab(self, file_path):
         r"""Loads a graph from file and adds it to a new tab."""
@@ -810,7 +941,10 @@ class GraphEditorWidget(Gtk.DrawingArea):
     Signals
     -------
     graph-changed : Emitted when graph changes (e.g. new vertex or edge has been placed,
-        position of a vertex has been changed).
+        position of a vertex has been changed). Besides state of the graph it carries
+        a list of ``(op, kind, index)`` tuples, where ``op`` is either ``"add"`` or ``"remove"``,
+        ``kind`` is either ``"v"`` or ``"e"``. ``None`` means anything may have changed
+        (e.g. vertices got renumbered).
     picked-changed : Emitted when selection has changed.
 
 `   Notes
@@ -851,10 +985,23 @@ class GraphEditorWidget(Gtk.DrawingArea):
         r"""An enum of modes."""
         select, place_node, place_edge = range(3)
 
-    __gsignals__ = {"graph-changed": (gobject.SignalFlags.RUN_FIRST, None, (bool,)),
+    __gsignals__ = {"graph-changed": (gobject.SignalFlags.RUN_FIRST, None, (bool, object)),
                     "picked-changed": (gobject.SignalFlags.RUN_FIRST, None, ())}
     modes = Modes()
 
+    # overlay colors
+    _PREPICKED_COLOR = (1., 0.7647058823529411, 0.13725490196078433, 0.75)
+    _PRESELECTED_COLOR = (1., 0.7647058823529411, 0.13725490196078433, 0.5)
+    _HIGHLIGHT_COLOR = (0.9372549019607843, 0.1607843137254902, 0.1607843137254902, .9)
+    _SELECTED_EDGE_COLOR = (0., 0., 1., 0.5)
+    _RECT_COLOR = (0., 0., 1., 0.3)
+    # milliseconds parallel edges wait for scroll zooming to settle
+    _PARALLEL_EDGES_DELAY = 30
+    # overrides of vprops drawing only edges
+    _HIDDEN_VERTICES = {"color": (0., 0., 0., 0.),
+                        "fill_color": (0., 0., 0., 0.),
+                        "text_color": (0., 0., 0., 0.)}
+
     def __init__(self, g, pos, vprops=None, eprops=None, vorder=None,
                  eorder=None, nodesfirst=False, fit_area=0.95, bg_color=None,
                  max_render_time=300, highlight_color=None, preselected_color=None,
@@ -906,6 +1053,8 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.is_moving = None
         self.is_panning = False
         self.vertex_matrix = None
+        self._vertex_by_index = None
+        self._edge_by_index = None
         self.moved_picked = False
         self.pad = fit_area
 
@@ -913,9 +1062,25 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.base = None
         self.base_geometry = None
         self.background = None
+        self.overlay = None
+        self.overlay_geometry = None
+        self.overlay_dirty = True
+        self._overlay_partial = False  # see regenerate_overlay_surface
+        self._overlay_layers = None
+        self._overlay_record = None
+        self._masks = {}
+        self._edge_array = None  # see _edges
+        self._pos_array = None  # see _positions
+        self._radii2 = None  # see _hit_radii2
+        self._radii2_key = None
+        self._cursors = {}  # see _cursor
+        self._busy_icon = None
+        self._parallel_edges_timeout = None
         self.bg_color = bg_color if bg_color is not None else (1, 1, 1, 1)
 
         self.regenerate_offset = 0
+        self._regenerate_source = None
+        self._shift_too_slow = False  # see shift_surface
         self.regenerate_max_time = max_render_time
         self.max_render_time = max_render_time
         self.lazy_regenerate = False
@@ -927,6 +1092,8 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.connect("key-press-event", self.key_press_event)
         self.connect("key-release-event", self.key_release_event)
         self.connect("destroy-event", self.cleanup)
+        self.connect("unrealize", self._remove_sources)
+        self.connect("destroy", self._remove_sources)
 
         self.set_events(Gdk.EventMask.EXPOSURE_MASK |
                         Gdk.EventMask.LEAVE_NOTIFY_MASK |
@@ -971,6 +1138,8 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.is_drag_gesture = False
         self.drag_last = [0, 0]
 
+        self.init_index_maps()
+
     def is_changed(self):
         r"""Returns value of last `graph-changed` signal or ``False`` if there wasn't any."""
         return self._changed
@@ -979,6 +1148,19 @@ class GraphEditorWidget(Gtk.DrawingArea):
     def cleanup(self):
         pass
 
+    def _remove_sources(self, *args):
+        r"""Removes pending idle and timeout sources, so they don't keep running (and the widget alive)
+        once it's unrealized."""
+        if self._regenerate_source is not None:
+            GLib.source_remove(self._regenerate_source)
+            self._regenerate_source = None
+        if self._parallel_edges_timeout is not None:
+            GLib.source_remove(self._parallel_edges_timeout)
+            self._parallel_edges_timeout = None
+        # base may be drawn halfway, it's regenerated if widget gets realized again
+        self.regenerate_offset = 0
+        self.lazy_regenerate = True
+
     def __del__(self):
         self.cleanup()
 
@@ -999,25 +1181,25 @@ class GraphEditorWidget(Gtk.DrawingArea):
             #                                *geometry)
             w = self.get_window()
             if w is None:
+                # unrealized (e.g. tab closed mid-render), nothing to continue on
+                self._remove_sources()
                 return False
             self.base = w.create_similar_surface(cairo.CONTENT_COLOR_ALPHA,
                                                  *geometry)
             self.base_geometry = geometry
             self.regenerate_offset = 0
 
-            m = cairo.Matrix()
-            m.translate(self.get_allocated_width(),
-                        self.get_allocated_height())
-            self.smatrix = self.smatrix * m
-            self.tmatrix = self.tmatrix * self.smatrix
-            self.smatrix = cairo.Matrix()
-            self.smatrix.translate(-self.get_allocated_width(),
-                                   -self.get_allocated_height())
+            # screen offset of surface is moved into tmatrix, matrices built by constructor
+            w, h = self.get_allocated_width(), self.get_allocated_height()
+            self.tmatrix = self.tmatrix * self.smatrix * cairo.Matrix(x0=w, y0=h)
+            self.smatrix = cairo.Matrix(x0=-w, y0=-h)
 
         cr = cairo.Context(self.base)
         if self.regenerate_offset == 0:
             cr.set_source_rgba(*self.bg_color)
             cr.paint()
+            # transformation may have changed
+            self.overlay_dirty = True
         cr.set_matrix(self.tmatrix)
         mtime = -1 if complete else self.regenerate_max_time
         res = 5 * self.get_scale_factor()
@@ -1027,432 +1209,465 @@ class GraphEditorWidget(Gtk.DrawingArea):
                            max_render_time=mtime, **self.kwargs)
         self.regenerate_offset = count
         self.lazy_regenerate = False
+        # rest is rendered while main loop is idle, so events are handled in between
+        if self.regenerate_offset > 0 and self._regenerate_source is None:
+            self._regenerate_source = GLib.idle_add(self._continue_regenerate)
+
+    def shift_surface(self):
+        r"""Recenter the graph surface by shifting what is already drawn on it, only the uncovered
+        part is redrawn. Returns ``False`` if it can't be done (e.g. view is rotated or scaled)."""
+        m = self.smatrix
+        w, h = self.get_allocated_width(), self.get_allocated_height()
+        if (self.base is None or self.regenerate_offset > 0 or self._shift_too_slow or
+                (m.xx, m.yx, m.xy, m.yy) != (1, 0, 0, 1) or self.base_geometry != [3 * w, 3 * h]):
+            return False
+        # whole pixels, so content isn't resampled
+        dx, dy = int(round(m.x0 + w)), int(round(m.y0 + h))
+        bw, bh = self.base_geometry
+        if abs(dx) >= bw or abs(dy) >= bh:
+            return False
 
-    def draw(self, da, cr):
-        r"""Redraw the widget."""
-
-        geometry = (self.get_allocated_width(),
-                    self.get_allocated_height())
-
-        if self.geometry is None:
-            adjust_default_sizes(self.g, geometry, self.vprops, self.eprops)
-            self.fit_to_window(ink=False)
-            # HACK: highlighted self-loops are not aligned without control_points
-            self.position_parallel_edges()
-            self.regenerate_surface()
-            self.geometry = geometry
+        base = self.get_window().create_similar_surface(cairo.CONTENT_COLOR_ALPHA, bw, bh)
+        cr = cairo.Context(base)
+        cr.set_source_surface(self.base, dx, dy)
+        cr.paint()
 
-        # QUESTION: is seamless property that prevents markers to be visible outside clipping area?
-        # HACK: sometimes markers outside area are visible yet
-        # e.g: when edge got highlighted while being outside,
-        #      vertex got moved outside area
-        # cr.rectangle(0, 0, *geometry)
-        # cr.clip()
+        # background is only filled where nothing got shifted
+        uncovered = cairo.Region(cairo.RectangleInt(0, 0, bw, bh))
+        uncovered.subtract(cairo.RectangleInt(dx, dy, bw, bh))
+        for i in range(uncovered.num_rectangles()):
+            rect = uncovered.get_rectangle(i)
+            cr.rectangle(rect.x, rect.y, rect.width, rect.height)
+        cr.clip()
+        cr.set_source_rgba(*self.bg_color)
+        cr.paint()
 
-        cr.save()
-        cr.set_matrix(self.smatrix)
-        c1 = self.pos_to_device([0, 0], surface=True, cr=cr)
-        c2 = self.pos_to_device([0, self.base_geometry[1]], surface=True, cr=cr)
-        c3 = self.pos_to_device([self.base_geometry[0], 0], surface=True, cr=cr)
-        c4 = self.pos_to_device(self.base_geometry, surface=True, cr=cr)
-        c = [c1, c2, c3, c4]
-        ul = [min([x[0] for x in c]), min([x[1] for x in c])]
-        lr = [max([x[0] for x in c]), max([x[1] for x in c])]
-        cr.restore()
+        tmatrix = self.tmatrix * cairo.Matrix(x0=dx, y0=dy)
+        cr.set_matrix(tmatrix)
+        # has to be done within one render budget, continuing it unclipped would draw over shifted
+        # content, if it can't be done a budgeted regeneration is cheaper than finishing it here
+        count = cairo_draw(self.g, self.pos, cr, self.vprops, self.eprops,
+                           self.vorder, self.eorder, self.nodesfirst,
+                           res=5 * self.get_scale_factor(),
+                           max_render_time=self.regenerate_max_time, **self.kwargs)
+        if count > 0:
+            # don't waste the budget on it again until graph changes
+            self._shift_too_slow = True
+            return False
+        self.tmatrix = tmatrix
+        self.smatrix = cairo.Matrix(x0=m.x0 - dx, y0=m.y0 - dy)
+        self.base = base
+        self.overlay_dirty = True
+        return True
 
-        if ((ul[0] > 0 or lr[0] < geometry[0] or
-             ul[1] > 0 or lr[1] < geometry[1]) or
-                self.lazy_regenerate):
-            self.regenerate_surface(reset=True)
-        elif self.regenerate_offset > 0:
+    def _continue_regenerate(self):
+        if self.get_window() is None:
+            self._regenerate_source = None
+            self.regenerate_offset = 0
+            self.lazy_regenerate = True
+            return False
+        if self.regenerate_offset > 0:
             self.regenerate_surface()
+            self.queue_draw()
+        if self.regenerate_offset > 0:
+            return True
+        self._regenerate_source = None
+        return False
 
-        if self.background is None:
-            # draw checkerboard
-            self.background = cairo.ImageSurface(cairo.FORMAT_ARGB32, 14, 14)
-            bcr = cairo.Context(self.background)
-            bcr.rectangle(0, 0, 7, 7)
-            bcr.set_source_rgb(102. / 256, 102. / 256, 102. / 256)
-            bcr.fill()
-            bcr.rectangle(7, 0, 7, 7)
-            bcr.set_source_rgb(153. / 256, 153. / 256, 153. / 256)
-            bcr.fill()
-            bcr.rectangle(0, 7, 7, 7)
-            bcr.set_source_rgb(153. / 256, 153. / 256, 153. / 256)
-            bcr.fill()
-            bcr.rectangle(7, 7, 7, 7)
-            bcr.set_source_rgb(102. / 256, 102. / 256, 102. / 256)
-            bcr.fill()
-            del bcr
-            self.background = cairo.SurfacePattern(self.background)
-            self.background.set_extend(cairo.EXTEND_REPEAT)
-
-        cr.set_source(self.background)
+    def regenerate_overlay_surface(self, visible_only=False):
+        r"""Redraw selection overlays onto a surface laid over the graph surface. If ``visible_only``,
+        only the part shown by the widget is redrawn, the rest is left stale until a full redraw."""
+        if self._overlay_layers is None:
+            self._overlay_layers = self._build_overlay_layers()
+            self._overlay_record = None
+        if self._overlay_record is None:
+            # recorded in graph space, replayed under current tmatrix until layers or positions change
+            self._overlay_record = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+            rcr = cairo.Context(self._overlay_record)
+            for u, vprops, eprops in self._overlay_layers:
+                cairo_draw(u, self.pos, rcr, vprops, eprops, self.vorder,
+                           self.eorder, self.nodesfirst)
+            del rcr
+        if self.overlay is None or self.overlay_geometry != self.base_geometry:
+            self.overlay = self.get_window().create_similar_surface(cairo.CONTENT_COLOR_ALPHA,
+                                                                    *self.base_geometry)
+            self.overlay_geometry = self.base_geometry
+        cr = cairo.Context(self.overlay)
+        if visible_only:
+            m = self.smatrix * cairo.Matrix()
+            m.invert()
+            w, h = self.get_allocated_width(), self.get_allocated_height()
+            corners = np.array([m.transform_point(x, y) for x, y in ((0, 0), (w, 0), (0, h), (w, h))])
+            (x0, y0), (x1, y1) = np.floor(corners.min(axis=0)), np.ceil(corners.max(axis=0))
+            cr.rectangle(x0, y0, x1 - x0, y1 - y0)
+            cr.clip()
+        self._overlay_partial = visible_only
+        cr.set_operator(cairo.OPERATOR_CLEAR)
         cr.paint()
-
-        cr.save()
-        cr.set_matrix(self.smatrix)
-        cr.set_source_surface(self.base)
+        cr.set_operator(cairo.OPERATOR_OVER)
+        cr.set_matrix(self.tmatrix)
+        cr.set_source_surface(self._overlay_record)
         cr.paint()
-        cr.restore()
+        self.overlay_dirty = False
 
-        # HACK: marker_size changes how control_points work, hence eprops needs to be copied
-        if self.picked is not None:
-            size = self.vprops.get("size", _vdefaults["size"])
-            if isinstance(size, PropertyMap):
-                size = size.fa.mean()
-            if (isinstance(self.picked, Vertex) or
-                    (isinstance(self.picked, PropertyMap) and self.picked.key_type() == 'v')):
-                if self.preselected_edges is not None:
-                    # draw preselected edges
-                    # no vertices
-                    vprops = self.vprops.copy()
-                    vprops["color"] = (0., 0., 0., 0.)
-                    vprops["fill_color"] = (0., 0., 0., 0.)
-                    vprops["text_color"] = (0., 0., 0., 0.)
-                    # fake edge halo
-                    eprops = self.eprops.copy()
-                    eprops["color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.5)
-                    eprops["pen_width"] = 0.4 * size
-                    eprops["seamless"] = True
-
-                    if self.prehighlight_color is not None:
-                        eprops["color"] = self.prehighlight_color
-
-                    shown_edges = self.preselected_edges.copy()
-                    if isinstance(self.prepicked, Edge):
-                        shown_edges[self.prepicked] = False
-
-                    u = GraphView(self.g, efilt=shown_edges)
+    def invalidate_overlay(self):
+        r"""Drops cached overlay layers, they are rebuilt on next redraw."""
+        self._overlay_layers = None
+        self.queue_draw()
 
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
+    # masks of overlay layers are kept by purpose, a rebuild drops previous layers before reusing them
+    def _mask(self, key, key_type, value_type="bool"):
+        r"""Returns a map of ``value_type`` kept under ``key``, which is allocated once.
+        The map is reused by the next call with the same ``key``."""
+        mask = self._masks.get(key)
+        if mask is None:
+            if key_type == 'v':
+                mask = self.g.new_vertex_property(value_type)
+            else:
+                mask = self.g.new_edge_property(value_type)
+            self._masks[key] = mask
+        return mask
+
+    def _copy_mask(self, key, src):
+        r"""Returns a copy of ``src`` written into the map kept under ``key``."""
+        mask = self._mask(key, src.key_type())
+        mask.a = src.a
+        return mask
+
+    def _xor_mask(self, key, a, b):
+        r"""Returns ``a`` XOR ``b`` written into the map kept under ``key``."""
+        mask = self._mask(key, a.key_type())
+        np.logical_xor(a.a, b.a, out=mask.a)
+        return mask
+
+    def _widened_pen_width(self):
+        r"""Returns edge pen width slightly widened to outline highlighted edges."""
+        pen_width = self.eprops.get("pen_width", _edefaults["pen_width"])
+        if isinstance(pen_width, PropertyMap):
+            widened = self._mask("pen_width", 'e', "double")
+            np.multiply(pen_width.a, 1.1, out=widened.a)
+            return widened
+        return pen_width * 1.1
+
+    def _color_map(self, key_type, colored):
+        r"""Returns a color map having ``color`` at elements given by ``where`` (a mask or indices)
+        for each ``(where, color)`` of ``colored``. Later ones take precedence."""
+        # keyed by element type too, both kinds may be in use by one overlay
+        channels = [self._mask(key_type + "_color_" + channel, key_type, "double") for channel in "rgba"]
+        for channel in channels:
+            channel.a = 0
+        for where, color in colored:
+            for channel, value in zip(channels, color):
+                channel.a[where] = value
+        return group_vector_property(channels, vprop=self._mask(key_type + "_color", key_type,
+                                                                 "vector<double>"))
+
+    def _preselected_vertices_layer(self):
+        r"""Returns a single layer of prepicked and preselected vertices, which share
+        everything but halo color, or ``None`` if there are neither."""
+        colored = []
+        shown_vertices = self._mask("preselected_vertices", 'v')
+        if self.preselected_vertices is not None:
+            shown_vertices.a = self.preselected_vertices.a
+            colored.append((self.preselected_vertices.a.astype(bool),
+                            GraphEditorWidget._PRESELECTED_COLOR
+                            if self.prehighlight_color is None else self.prehighlight_color))
+        else:
+            shown_vertices.a = False
+        if isinstance(self.prepicked, Vertex):
+            shown_vertices[self.prepicked] = True
+            colored.append((int(self.prepicked), GraphEditorWidget._PREPICKED_COLOR))
+        # preselection may have been trimmed to nothing
+        if not colored or not shown_vertices.a.any():
+            return None
 
-                # draw vertices and edges connected to selected ones
-                self.highlight = self.selected_vertices.copy()
+        vprops = self.vprops.copy()
+        vprops["halo"] = True
+        vprops["halo_color"] = self._color_map('v', colored)
+        return GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges), vprops, self.eprops
+
+    def _edges(self):
+        r"""Returns an array of ``(source, target, index)`` rows of edges, cached until graph changes."""
+        if self._edge_array is None:
+            self._edge_array = self.g.get_edges([self.g.edge_index])
+        return self._edge_array
+
+    def _infect_neighbours(self, prop):
+        r"""Marks neighbours of vertices marked by ``prop`` as well, regardless of edge directions."""
+        source, target = self._edges()[:, 0], self._edges()[:, 1]
+        marked = prop.a.astype(bool)
+        prop.a[target[marked[source]]] = True
+        prop.a[source[marked[target]]] = True
+
+    def _build_overlay_layers(self):
+        r"""Returns ``(GraphView, vprops, eprops)`` tuples of selection overlays in drawing order."""
+        layers = []
+        # layers are drawn later, maps and dicts handed over to a layer must not be altered afterwards
+        # HACK: marker_size changes how control_points work, hence eprops needs to be copied
+        size = self.vprops.get("size", _vdefaults["size"])
+        if isinstance(size, PropertyMap):
+            size = size.fa.mean()
+        if (isinstance(self.picked, Vertex) or
+                (isinstance(self.picked, PropertyMap) and self.picked.key_type() == 'v')):
+            if self.preselected_edges is not None:
+                # draw preselected edges
+                # no vertices
                 vprops = self.vprops.copy()
-                vprops["halo"] = self.highlight
-                vprops["halo_color"] = (0.9372549019607843, 0.1607843137254902, 0.1607843137254902, .9)
-                vprops["halo_size"] = 1.3
+                vprops.update(GraphEditorWidget._HIDDEN_VERTICES)
+                # fake edge halo
                 eprops = self.eprops.copy()
-                eprops["color"] = (0.9372549019607843, 0.1607843137254902, 0.1607843137254902, .9)
+                eprops["color"] = GraphEditorWidget._PRESELECTED_COLOR
+                eprops["pen_width"] = 0.4 * size
                 eprops["seamless"] = True
 
-                if self.highlight_color is not None:
-                    vprops["halo_color"] = self.highlight_color
-                    eprops["color"] = self.highlight_color
-
-                infect_vertex_property(GraphView(self.g, directed=False),
-                                       self.highlight, [True])
-
-                shown_vertices = self.highlight.copy()
-                if self.preselected_edges is not None:
-                    shown_edges = self.g.new_edge_property("bool", np.logical_xor(self.preselected_edges.fa,
-                                                                                  self.selected_edges.fa))
-                else:
-                    shown_edges = self.selected_edges.copy()
-
-                self.highlight.fa = np.logical_xor(self.selected_vertices.fa,
-                                                   self.highlight.fa)
-
-                u = GraphView(self.g, vfilt=shown_vertices, efilt=shown_edges)
-
-                eprops["pen_width"] = self.eprops.get("pen_width",
-                                                      _edefaults["pen_width"])
-                if isinstance(eprops["pen_width"], PropertyMap):
-                    pw = eprops["pen_width"]
-                    pw = u.own_property(pw.copy())
-                    pw.fa *= 1.1
-                else:
-                    eprops["pen_width"] *= 1.1
-
-                cr.save()
-                cr.set_matrix(self.tmatrix * self.smatrix)
-                cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                           self.eorder, self.nodesfirst)
-                cr.restore()
+                if self.prehighlight_color is not None:
+                    eprops["color"] = self.prehighlight_color
 
+                shown_edges = self._copy_mask("preselected_edges", self.preselected_edges)
                 if isinstance(self.prepicked, Edge):
-                    # draw prepicked edge
-                    # no vertices
-                    vprops = self.vprops.copy()
-                    vprops["color"] = (0., 0., 0., 0.)
-                    vprops["fill_color"] = (0., 0., 0., 0.)
-                    vprops["text_color"] = (0., 0., 0., 0.)
-                    # fake edge halo
-                    eprops = self.eprops.copy()
-                    eprops["color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.75)
-                    eprops["pen_width"] = 0.4 * size
-                    eprops["seamless"] = True
-
-                    shown_edges = self.g.new_edge_property("bool", False)
-                    shown_edges[self.prepicked] = True
-
-                    u = GraphView(self.g, efilt=shown_edges)
-
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
-
-                # no edges
-                eprops = {}
-                if isinstance(self.prepicked, Vertex):
-                    # draw prepicked vertices
-                    vprops = self.vprops.copy()
-                    vprops["halo"] = True
-                    vprops["halo_color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.75)
-
-                    shown_vertices = self.g.new_vertex_property("bool", False)
-                    shown_vertices[self.prepicked] = True
-
-                    u = GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges)
-
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, self.eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
-
-                if self.preselected_vertices is not None:
-                    # draw preselected vertices
-                    vprops = self.vprops.copy()
-                    vprops["halo"] = True
-                    vprops["halo_color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.5)
+                    shown_edges[self.prepicked] = False
 
-                    if self.prehighlight_color is not None:
-                        vprops["halo_color"] = self.prehighlight_color
+                if shown_edges.a.any():
+                    layers.append((GraphView(self.g, efilt=shown_edges), vprops, eprops))
 
-                    shown_vertices = self.preselected_vertices.copy()
-                    if isinstance(self.prepicked, Vertex):
-                        shown_vertices[self.prepicked] = False
+            # draw vertices and edges connected to selected ones
+            self.highlight.a = self.selected_vertices.a
+            vprops = self.vprops.copy()
+            vprops["halo"] = self.highlight
+            vprops["halo_color"] = GraphEditorWidget._HIGHLIGHT_COLOR
+            vprops["halo_size"] = 1.3
+            eprops = self.eprops.copy()
+            eprops["color"] = GraphEditorWidget._HIGHLIGHT_COLOR
+            eprops["seamless"] = True
 
-                    u = GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges)
+            if self.highlight_color is not None:
+                vprops["halo_color"] = self.highlight_color
+                eprops["color"] = self.highlight_color
 
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, self.eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
+            self._infect_neighbours(self.highlight)
 
-                    shown_vertices.fa = np.logical_xor(self.selected_vertices.fa,
-                                                       self.preselected_vertices.fa)
-                else:
-                    shown_vertices.fa = self.selected_vertices.fa
+            shown_vertices = self._copy_mask("highlighted", self.highlight)
+            if self.preselected_edges is not None:
+                shown_edges = self._xor_mask("shown_edges", self.preselected_edges, self.selected_edges)
+            else:
+                shown_edges = self._copy_mask("shown_edges", self.selected_edges)
 
-                # draw selected vertices
-                vprops = self.vprops.copy()
-                vprops["halo"] = True
+            np.logical_xor(self.selected_vertices.a, self.highlight.a, out=self.highlight.a)
 
-                if isinstance(self.prepicked, Vertex):
-                    shown_vertices[self.prepicked] = False
+            u = GraphView(self.g, vfilt=shown_vertices, efilt=shown_edges)
 
-                u = GraphView(self.g, vfilt=shown_vertices,
-                              efilt=self.__no_edges)
+            eprops["pen_width"] = self._widened_pen_width()
 
-                cr.save()
-                cr.set_matrix(self.tmatrix * self.smatrix)
-                cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                           self.eorder, self.nodesfirst)
-                cr.restore()
+            layers.append((u, vprops, eprops))
 
-            elif (isinstance(self.picked, Edge) or
-                    (isinstance(self.picked, PropertyMap) and self.picked.key_type() == 'e')):
-                # draw edges connected selected vertices
+            if isinstance(self.prepicked, Edge):
+                # draw prepicked edge
                 # no vertices
                 vprops = self.vprops.copy()
-                vprops["color"] = (0., 0., 0., 0.)
-                vprops["fill_color"] = (0., 0., 0., 0.)
-                vprops["text_color"] = (0., 0., 0., 0.)
+                vprops.update(GraphEditorWidget._HIDDEN_VERTICES)
+                # fake edge halo
                 eprops = self.eprops.copy()
-                eprops["color"] = (0.9372549019607843, 0.1607843137254902, 0.1607843137254902, .9)
+                eprops["color"] = GraphEditorWidget._PREPICKED_COLOR
+                eprops["pen_width"] = 0.4 * size
                 eprops["seamless"] = True
 
-                if self.highlight_color is not None:
-                    eprops["color"] = self.highlight_color
+                shown_edges = self._mask("prepicked_edge", 'e')
+                shown_edges.a = False
+                shown_edges[self.prepicked] = True
 
-                shown_vertices = self.selected_vertices.copy()
-                shown_edges = self.g.new_edge_property("bool", np.logical_not(self.selected_edges.fa))
+                layers.append((GraphView(self.g, efilt=shown_edges), vprops, eprops))
 
-                infect_vertex_property(GraphView(self.g, directed=False),
-                                       shown_vertices, [True])
+            # no edges
+            eprops = {}
+            # draw prepicked and preselected vertices
+            layer = self._preselected_vertices_layer()
+            if layer is not None:
+                layers.append(layer)
 
-                u = GraphView(self.g,
-                              vfilt=self.g.new_vertex_property("bool", np.logical_xor(self.selected_vertices.fa,
-                                                                                      shown_vertices.fa)))
+            if self.preselected_vertices is not None:
+                shown_vertices = self._xor_mask("shown_vertices", self.selected_vertices,
+                                                self.preselected_vertices)
+            else:
+                shown_vertices = self._copy_mask("shown_vertices", self.selected_vertices)
 
-                for edge in u.edges():
-                    shown_edges[edge] = False
+            # draw selected vertices
+            vprops = self.vprops.copy()
+            vprops["halo"] = True
 
-                u = GraphView(self.g, vfilt=shown_vertices, efilt=shown_edges)
+            if isinstance(self.prepicked, Vertex):
+                shown_vertices[self.prepicked] = False
 
-                eprops["pen_width"] = self.eprops.get("pen_width",
-                                                      _edefaults["pen_width"])
-                if isinstance(eprops["pen_width"], PropertyMap):
-                    pw = eprops["pen_width"]
-                    pw = u.own_property(pw.copy())
-                    pw.fa *= 1.1
-                else:
-                    eprops["pen_width"] *= 1.1
+            # empty selection needs no cairo_draw call
+            if shown_vertices.a.any():
+                layers.append((GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges),
+                               vprops, eprops))
 
-                cr.save()
-                cr.set_matrix(self.tmatrix * self.smatrix)
-                cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                           self.eorder, self.nodesfirst)
-                cr.restore()
+        elif (isinstance(self.picked, Edge) or
+                (isinstance(self.picked, PropertyMap) and self.picked.key_type() == 'e')):
+            # draw edges connected selected vertices
+            # no vertices
+            vprops = self.vprops.copy()
+            vprops.update(GraphEditorWidget._HIDDEN_VERTICES)
+            eprops = self.eprops.copy()
+            eprops["color"] = GraphEditorWidget._HIGHLIGHT_COLOR
+            eprops["seamless"] = True
 
-                # draw selected edges
-                # fake edge halo
-                eprops["color"] = (0., 0., 1., 0.5)
-                eprops["pen_width"] = 0.4 * size
+            if self.highlight_color is not None:
+                eprops["color"] = self.highlight_color
 
-                if self.preselected_edges is not None:
-                    shown_edges = self.g.new_edge_property("bool", np.logical_xor(self.preselected_edges.fa,
-                                                                                  self.selected_edges.fa))
-                else:
-                    shown_edges = self.selected_edges.copy()
+            shown_vertices = self._copy_mask("highlighted", self.selected_vertices)
+            shown_edges = self._mask("connected_edges", 'e')
+            np.logical_not(self.selected_edges.a, out=shown_edges.a)
 
-                if isinstance(self.prepicked, Edge):
-                    shown_edges[self.prepicked] = False
+            self._infect_neighbours(shown_vertices)
 
-                u = GraphView(self.g, vfilt=shown_vertices, efilt=shown_edges)
+            # hide edges between neighbours that aren't selected
+            neighbours = np.logical_xor(self.selected_vertices.a, shown_vertices.a)
+            source, target, index = self._edges().T
+            shown_edges.a[index[neighbours[source] & neighbours[target]]] = False
 
-                cr.save()
-                cr.set_matrix(self.tmatrix * self.smatrix)
-                cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                           self.eorder, self.nodesfirst)
-                cr.restore()
+            u = GraphView(self.g, vfilt=shown_vertices, efilt=shown_edges)
 
-                if self.preselected_edges is not None:
-                    # draw preselected edges
-                    # fake edge halo
-                    eprops["color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.5)
-                    eprops["pen_width"] = 0.4 * size
+            eprops["pen_width"] = self._widened_pen_width()
 
-                    if self.prehighlight_color is not None:
-                        eprops["color"] = self.prehighlight_color
+            layers.append((u, vprops, eprops))
 
-                    shown_edges = self.preselected_edges.copy()
-                    if isinstance(self.prepicked, Edge):
-                        shown_edges[self.prepicked] = False
+            # draw selected edges
+            # fake edge halo
+            eprops = eprops.copy()
+            eprops["color"] = GraphEditorWidget._SELECTED_EDGE_COLOR
+            eprops["pen_width"] = 0.4 * size
 
-                    u = GraphView(self.g, efilt=shown_edges)
+            if self.preselected_edges is not None:
+                shown_edges = self._xor_mask("shown_edges", self.preselected_edges, self.selected_edges)
+            else:
+                shown_edges = self._copy_mask("shown_edges", self.selected_edges)
 
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
+            if isinstance(self.prepicked, Edge):
+                shown_edges[self.prepicked] = False
 
-                if isinstance(self.prepicked, Edge):
-                    # draw prepicked edge
-                    # fake edge halo
-                    eprops = self.eprops.copy()
-                    eprops["color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.75)
-                    eprops["pen_width"] = 0.4 * size
-                    eprops["seamless"] = True
+            if shown_edges.a.any():
+                layers.append((GraphView(self.g, vfilt=shown_vertices, efilt=shown_edges), vprops, eprops))
 
-                    shown_edges = self.g.new_edge_property("bool", False)
+            if self.preselected_edges is not None or isinstance(self.prepicked, Edge):
+                # draw preselected and prepicked edges at once
+                # fake edge halo
+                colored = []
+                shown_edges = self._mask("preselected_edges", 'e')
+                if self.preselected_edges is not None:
+                    shown_edges.a = self.preselected_edges.a
+                    colored.append((self.preselected_edges.a.astype(bool),
+                                    GraphEditorWidget._PRESELECTED_COLOR
+                                    if self.prehighlight_color is None else self.prehighlight_color))
+                else:
+                    shown_edges.a = False
+                if isinstance(self.prepicked, Edge):
                     shown_edges[self.prepicked] = True
+                    colored.append((int(self.g.edge_index[self.prepicked]),
+                                    GraphEditorWidget._PREPICKED_COLOR))
 
-                    u = GraphView(self.g, efilt=shown_edges)
+                if shown_edges.a.any():
+                    eprops = eprops.copy()
+                    eprops["color"] = self._color_map('e', colored)
+                    eprops["pen_width"] = 0.4 * size
 
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
+                    layers.append((GraphView(self.g, efilt=shown_edges), vprops, eprops))
 
-                # no edges
-                eprops = {}
-                if isinstance(self.prepicked, Vertex):
-                    # draw prepicked vertices
-                    vprops = self.vprops.copy()
-                    vprops["halo"] = True
-                    vprops["halo_color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.75)
+            # no edges
+            eprops = {}
+            # draw prepicked and preselected vertices
+            layer = self._preselected_vertices_layer()
+            if layer is not None:
+                layers.append(layer)
 
-                    shown_vertices = self.g.new_vertex_property("bool", False)
-                    shown_vertices[self.prepicked] = True
+            if self.preselected_vertices is not None:
+                np.logical_xor(self.selected_vertices.a, self.preselected_vertices.a,
+                               out=self.highlight.a)
+            else:
+                self.highlight.a = self.selected_vertices.a
 
-                    u = GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges)
+            # draw selected vertices and connected edges
+            vprops = self.vprops.copy()
+            vprops["halo"] = self.highlight
+            vprops["halo_color"] = GraphEditorWidget._HIGHLIGHT_COLOR
+            vprops["halo_size"] = 1.3
 
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, self.eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
+            if self.highlight_color is not None:
+                vprops["halo_color"] = self.highlight_color
 
-                if self.preselected_vertices is not None:
-                    # draw preselected vertices
-                    vprops = self.vprops.copy()
-                    vprops["halo"] = True
-                    vprops["halo_color"] = (1., 0.7647058823529411, 0.13725490196078433, 0.5)
+            shown_vertices = self._copy_mask("selected_vertices", self.selected_vertices)
 
-                    if self.prehighlight_color is not None:
-                        vprops["halo_color"] = self.prehighlight_color
+            if isinstance(self.prepicked, Vertex):
+                shown_vertices[self.prepicked] = False
 
-                    shown_vertices = self.preselected_vertices.copy()
-                    if isinstance(self.prepicked, Vertex):
-                        shown_vertices[self.prepicked] = False
+            # empty selection needs no cairo_draw call
+            if shown_vertices.a.any():
+                layers.append((GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges),
+                               vprops, eprops))
+        return layers
 
-                    u = GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges)
+    def draw(self, da, cr):
+        r"""Redraw the widget."""
 
-                    cr.save()
-                    cr.set_matrix(self.tmatrix * self.smatrix)
-                    cairo_draw(u, self.pos, cr, vprops, self.eprops, self.vorder,
-                               self.eorder, self.nodesfirst)
-                    cr.restore()
+        geometry = (self.get_allocated_width(),
+                    self.get_allocated_height())
 
-                    self.highlight.fa = np.logical_xor(self.selected_vertices.fa,
-                                                       self.preselected_vertices.fa)
-                else:
-                    self.highlight.fa = self.selected_vertices.fa
+        if self.geometry is None:
+            adjust_default_sizes(self.g, geometry, self.vprops, self.eprops)
+            self.fit_to_window(ink=False)
+            # HACK: highlighted self-loops are not aligned without control_points
+            self.position_parallel_edges()
+            self.regenerate_surface()
+            self.geometry = geometry
 
-                # draw selected vertices and connected edges
-                vprops = self.vprops.copy()
-                vprops["halo"] = self.highlight
-                vprops["halo_color"] = (0.9372549019607843, 0.1607843137254902, 0.1607843137254902, .9)
-                vprops["halo_size"] = 1.3
+        # QUESTION: is seamless property that prevents markers to be visible outside clipping area?
+        # HACK: sometimes markers outside area are visible yet
+        # e.g: when edge got highlighted while being outside,
+        #      vertex got moved outside area
+        # cr.rectangle(0, 0, *geometry)
+        # cr.clip()
+
+        w, h = self.base_geometry
+        c = self.pos_to_device_batch([[0, 0], [0, h], [w, 0], [w, h]], surface=True)
+        ul = c.min(axis=0)
+        lr = c.max(axis=0)
 
-                if self.highlight_color is not None:
-                    vprops["halo_color"] = self.highlight_color
+        if ((ul[0] > 0 or lr[0] < geometry[0] or
+             ul[1] > 0 or lr[1] < geometry[1]) or
+                self.lazy_regenerate):
+            if self.lazy_regenerate or not self.shift_surface():
+                self.regenerate_surface(reset=True)
 
-                shown_vertices = self.selected_vertices.copy()
+        if self.background is None:
+            # draw checkerboard
+            self.background = cairo.ImageSurface.create_for_data(memoryview(_checkerboard), cairo.FORMAT_ARGB32,
+                                                                 14, 14, 14 * 4)
+            self.background = cairo.SurfacePattern(self.background)
+            self.background.set_extend(cairo.EXTEND_REPEAT)
 
-                if isinstance(self.prepicked, Vertex):
-                    shown_vertices[self.prepicked] = False
+        cr.set_source(self.background)
+        cr.paint()
 
-                u = GraphView(self.g, vfilt=shown_vertices, efilt=self.__no_edges)
+        # both surfaces share the transformation
+        cr.save()
+        cr.set_matrix(self.smatrix)
+        cr.set_source_surface(self.base)
+        cr.paint()
 
-                cr.save()
-                cr.set_matrix(self.tmatrix * self.smatrix)
-                cairo_draw(u, self.pos, cr, vprops, eprops, self.vorder,
-                           self.eorder, self.nodesfirst)
-                cr.restore()
+        if self.picked is not None:
+            # overlays only change along with selection, graph, positions or sizes
+            # while dragging only the visible part is worth redrawing on each motion
+            dragging = self.is_moving is not None
+            if (self.overlay_dirty or self._overlay_layers is None or
+                    (self._overlay_partial and not dragging)):
+                self.regenerate_overlay_surface(visible_only=dragging)
+            cr.set_source_surface(self.overlay)
+            cr.paint()
+        cr.restore()
 
-        if self.srect is not None:
-            cr.move_to(self.srect[0], self.srect[1])
-            cr.line_to(self.srect[0], self.srect[3])
-            cr.line_to(self.srect[2], self.srect[3])
-            cr.line_to(self.srect[2], self.srect[1])
-            cr.line_to(self.srect[0], self.srect[1])
-            cr.close_path()
-            cr.set_source_rgba(0, 0, 1, 0.3)
-            cr.fill()
-
-        if self.zrect is not None:
-            cr.move_to(self.zrect[0], self.zrect[1])
-            cr.line_to(self.zrect[0], self.zrect[3])
-            cr.line_to(self.zrect[2], self.zrect[3])
-            cr.line_to(self.zrect[2], self.zrect[1])
-            cr.line_to(self.zrect[0], self.zrect[1])
-            cr.close_path()
-            cr.set_source_rgba(0, 0, 1, 0.3)
-            cr.fill()
+        for rect in (self.srect, self.zrect):
+            if rect is not None:
+                GraphEditorWidget._fill_rect(cr, rect, GraphEditorWidget._RECT_COLOR)
 
         if self.new_edge is not None:
             vprops = {"color": (0, 0, 0, 0), "fill_color": (0, 0, 0, 0)}
@@ -1476,40 +1691,69 @@ class GraphEditorWidget(Gtk.DrawingArea):
             cr.restore()
 
         if self.regenerate_offset > 0:
-            icon = self.render_icon(Gtk.STOCK_EXECUTE, Gtk.IconSize.BUTTON)
-            Gdk.cairo_set_source_pixbuf(cr, icon, 10, 10)
+            if self._busy_icon is None:
+                self._busy_icon = self.render_icon(Gtk.STOCK_EXECUTE, Gtk.IconSize.BUTTON)
+            Gdk.cairo_set_source_pixbuf(cr, self._busy_icon, 10, 10)
             cr.paint()
 
         # deleted code: show picked vertex index according to display_props in lower left corner
-
-        if self.regenerate_offset > 0:
-            self.queue_draw()
         return False
 
+    @staticmethod
+    def _fill_rect(cr, r, rgba):
+        r"""Fills rectangle spanned by corners ``(r[0], r[1])`` and ``(r[2], r[3])``."""
+        cr.rectangle(r[0], r[1], r[2] - r[0], r[3] - r[1])
+        cr.set_source_rgba(*rgba)
+        cr.fill()
+
+    def queue_draw_rects(self, rects, pad=0):
+        r"""Queues redraw of the union of ``rects`` given as ``[x0, y0, x1, y1]`` in the widget space,
+        each one grown by ``pad`` on every side."""
+        region = cairo.Region()
+        for x0, y0, x1, y1 in rects:
+            x = int(np.floor(min(x0, x1) - pad))
+            y = int(np.floor(min(y0, y1) - pad))
+            region.union(cairo.RectangleInt(x, y,
+                                            int(np.ceil(max(x0, x1) + pad)) - x,
+                                            int(np.ceil(max(y0, y1) + pad)) - y))
+        self.queue_draw_region(region)
+
+    def _device_matrix(self, surface=False):
+        r"""Returns a new matrix mapping to the device space, from the surface space if ``surface``
+        else from the graph space."""
+        return self.smatrix * cairo.Matrix() if surface else self.tmatrix * self.smatrix
+
     def pos_to_device(self, pos, dist=False, surface=False, cr=None):
         r"""Convert a position from the graph space to the widget space."""
         ox, oy = self.get_window().get_position()
         if cr is None:
-            cr = self.get_window().cairo_create()
-            if surface:
-                cr.set_matrix(self.smatrix)
-            else:
-                cr.set_matrix(self.tmatrix * self.smatrix)
+            # plain matrix math, no need for a cairo context
+            m = self._device_matrix(surface)
+            if dist:
+                return m.transform_distance(pos[0], pos[1])
+            x, y = m.transform_point(pos[0], pos[1])
+            return x - ox, y - oy
         if dist:
             return cr.user_to_device_distance(pos[0], pos[1])
         else:
             x, y = cr.user_to_device(pos[0], pos[1])
             return x - ox, y - oy
 
+    def pos_to_device_batch(self, pos, surface=False):
+        r"""Convert an array of positions from the graph space to the widget space at once."""
+        ox, oy = self.get_window().get_position()
+        m = self.smatrix if surface else self.tmatrix * self.smatrix
+        return np.dot(pos, [[m.xx, m.yx], [m.xy, m.yy]]) + [m.x0 - ox, m.y0 - oy]
+
     def pos_from_device(self, pos, dist=False, surface=False, cr=None):
         r"""Convert a position from the widget space to the device space."""
         ox, oy = self.get_window().get_position()
         if cr is None:
-            cr = self.get_window().cairo_create()
-            if surface:
-                cr.set_matrix(self.smatrix)
-            else:
-                cr.set_matrix(self.tmatrix * self.smatrix)
+            m = self._device_matrix(surface)
+            m.invert()
+            if dist:
+                return m.transform_distance(pos[0], pos[1])
+            return m.transform_point(pos[0] + ox, pos[1] + oy)
         if dist:
             return cr.device_to_user_distance(pos[0], pos[1])
         else:
@@ -1527,44 +1771,94 @@ class GraphEditorWidget(Gtk.DrawingArea):
                         y_range[1] - y_range[0]) / np.sqrt(self.g.num_vertices())
             if m_res == 0:
                 self.pos = sfdp_layout(self.g)
+                self._pos_array = None
             self.vertex_matrix = VertexMatrix(self.g, self.pos)
 
+    def _positions(self):
+        r"""Returns vertex positions as an array of ``(x, y)`` rows, cached until vertices are moved
+        or graph changes."""
+        if self._pos_array is None:
+            self._pos_array = self.pos.get_2d_array([0, 1]).T
+        return self._pos_array
+
+    def _translate_vertices(self, ids, delta):
+        r"""Moves vertices with indices ``ids`` by ``delta`` at once, keeping vertex matrix up to date."""
+        xy = self._positions()
+        old = xy[ids]
+        xy[ids] = old + delta
+        self.pos.set_2d_array(xy.T, pos=[0, 1])
+
+        if self.vertex_matrix is not None:
+            # only vertices crossing a box boundary need to be rehashed
+            old_boxes = np.floor(old / self.vertex_matrix.m_res).astype(int)
+            new_boxes = np.floor(xy[ids] / self.vertex_matrix.m_res).astype(int)
+            for i in np.flatnonzero((old_boxes != new_boxes).any(axis=1)):
+                v = self.g.vertex(int(ids[i]))
+                self.vertex_matrix.m[tuple(old_boxes[i].tolist())].remove(v)
+                self.vertex_matrix.m[tuple(new_boxes[i].tolist())].add(v)
+
+    def _cursor(self, name):
+        r"""Returns cursor of :class:`Gdk.CursorType` ``name`` or the zoom cursor for ``"ZOOM_IN"``,
+        created on first use."""
+        cursor = self._cursors.get(name)
+        if cursor is None:
+            if name == "ZOOM_IN":
+                icon = Gtk.Widget.render_icon(Gtk.Image(), Gtk.STOCK_ZOOM_IN, Gtk.IconSize.BUTTON)
+                cursor = Gdk.Cursor.new_from_pixbuf(self.get_display(), icon, 0, 0)
+            else:
+                cursor = Gdk.Cursor(getattr(Gdk.CursorType, name))
+            self._cursors[name] = cursor
+        return cursor
+
+    def _first_selected_vertex(self):
+        r"""Returns selected vertex with the lowest index or ``None`` if none is selected."""
+        selected = np.flatnonzero(self.selected_vertices.a)
+        return self.g.vertex(int(selected[0])) if selected.size else None
+
+    def init_index_maps(self):
+        r"""Init maps from vertex and edge indices to their descriptors."""
+        self._vertex_by_index = {int(v): v for v in self.g.vertices()}
+        self._edge_by_index = {int(self.g.edge_index[e]): e for e in self.g.edges()}
+
     # IDEA: a feature VertexMatrix is severely lacking
     def is_hit(self, pos):
         if self.g.num_vertices() == 0:
             return None
 
-        def wrap_prop(prop):
-            def mapped_prop(item):
-                return prop[item]
-
-            def single_prop(item):
-                return prop
-
-            return mapped_prop if isinstance(prop, PropertyMap) else single_prop
-
-        size = wrap_prop(self.vprops["size"])
         pos = np.array(pos)
 
         if self.g.num_vertices() == 1:
-            v = next(self.g.vertices())
-            ndist = ((pos - self.pos[v].a[:2]) ** 2).sum()
-            if ndist * 3 < (size(v) / self.scale) ** 2:
-                return v
+            candidates = np.zeros(1, dtype=int)
         else:
             if self.vertex_matrix is None:
                 self.init_vertex_matrix()
 
             box = self.vertex_matrix.get_box(pos)
 
-            for i in range(-1, 2):
-                for j in range(-1, 2):
-                    b = (box[0] + i, box[1] + j)
-                    for v in self.vertex_matrix.m[b]:
-                        ndist = ((pos - self.pos[v].a[:2]) ** 2).sum()
-                        if ndist * 3 < (size(v) / self.scale) ** 2:
-                            return v
-        return None
+            # neighbouring boxes in the order they used to be scanned, first hit wins
+            candidates = np.array([int(v) for i in range(-1, 2) for j in range(-1, 2)
+                                   for v in self.vertex_matrix.m[(box[0] + i, box[1] + j)]], dtype=int)
+            if candidates.size == 0:
+                return None
+
+        radii2 = self._hit_radii2()
+        if np.ndim(radii2) > 0:
+            radii2 = radii2[candidates]
+        ndist = ((self._positions()[candidates] - pos) ** 2).sum(axis=1)
+        hit = np.flatnonzero(ndist < radii2)
+        return self.g.vertex(int(candidates[hit[0]])) if hit.size else None
+
+    def _hit_radii2(self):
+        r"""Returns squared hit radii of vertices in the graph space, either an array or a single value,
+        cached until scale, vertex sizes or graph change."""
+        size = self.vprops["size"]
+        key = (self.scale, id(size) if isinstance(size, PropertyMap) else size)
+        if self._radii2_key != key:
+            if isinstance(size, PropertyMap):
+                size = size.a
+            self._radii2 = (size / self.scale) ** 2 / 3
+            self._radii2_key = key
+        return self._radii2
 
     def fit_to_window(self, ink=False, g=None):
         r"""Fit graph to window."""
@@ -1593,6 +1887,7 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.smatrix = cairo.Matrix()
         if ink:
             scale_ink(zoom, self.vprops, self.eprops)
+            self._radii2_key = None
 
     def position_parallel_edges(self):
         r"""Calculate control points for parallel edges."""
@@ -1603,14 +1898,44 @@ class GraphEditorWidget(Gtk.DrawingArea):
             distance = distance.fa.mean()
         distance /= 1.5 * self.scale
         self.eprops["control_points"] = position_parallel_edges(self.g, self.pos, np.nan, distance)
+        self._overlay_layers = None
+
+    def _schedule_parallel_edges(self):
+        r"""Calculates control points for parallel edges and regenerates the surface after a short delay,
+        so zoom steps arriving meanwhile share a single calculation and regeneration."""
+        if self._parallel_edges_timeout is None:
+            self._parallel_edges_timeout = GLib.timeout_add(GraphEditorWidget._PARALLEL_EDGES_DELAY,
+                                                            self._position_parallel_edges_later)
+
+    def _position_parallel_edges_later(self):
+        self._parallel_edges_timeout = None
+        self.position_parallel_edges()
+        self.lazy_regenerate = True
+        self.queue_draw()
+        return False
 
-    def do_graph_changed(self, to):
+    def do_graph_changed(self, to, delta):
         r"""Regenerates surface and redraws widget if ``to`` is ``True``. Stores value of ``to`` for later.
-        (see :meth:`~GraphEditorWidget.is_changed`)."""
+        (see :meth:`~GraphEditorWidget.is_changed`). Index maps are rebuilt if ``delta`` is ``None``,
+        otherwise removed elements are dropped from them (added ones are registered when placed)."""
         self._changed = to
         if to:
+            self._edge_array = None
+            self._pos_array = None
+            self._radii2_key = None
+            self._shift_too_slow = False
+            if delta is None:
+                self.init_index_maps()
+            else:
+                for op, kind, i in delta:
+                    if op == "remove":
+                        if kind == "v":
+                            self._vertex_by_index.pop(i, None)
+                        else:
+                            self._edge_by_index.pop(i, None)
+            # also drops overlay layers
             self.position_parallel_edges()
-            self.regenerate_surface(reset=True, complete=True)
+            self.regenerate_surface(reset=True)
             self.queue_draw()
 
     def do_picked_changed(self):
@@ -1623,31 +1948,27 @@ class GraphEditorWidget(Gtk.DrawingArea):
 
                 hsrc = edge_endpoint_property(self.g, self.selected_vertices, "source")
                 htgt = edge_endpoint_property(self.g, self.selected_vertices, "target")
-                self.selected_edges.fa = np.logical_or(hsrc.fa, htgt.fa)
+                np.logical_or(hsrc.a, htgt.a, out=self.selected_edges.a)
 
             elif (isinstance(self.picked, Edge) or
                   (isinstance(self.picked, PropertyMap) and self.picked.key_type() == 'e')):
-                u = GraphView(self.g,
-                              efilt=self.selected_edges)
-
-                # IDEA: do it with libcore
-                # like edge_endpoint_property, but has input as an edge property
-                self.selected_vertices.fa = False
-                for edge in u.edges():
-                    self.selected_vertices[edge.source()] = True
-                    self.selected_vertices[edge.target()] = True
+                edges = self._edges()
+                endpoints = edges[self.selected_edges.a[edges[:, 2]].astype(bool), :2]
+                self.selected_vertices.a = False
+                self.selected_vertices.a[endpoints.ravel()] = True
 
             if self.preselected_vertices is not None:
-                self.preselected_vertices.fa = np.logical_and(self.selected_vertices.fa,
-                                                              self.preselected_vertices.fa)
+                np.logical_and(self.selected_vertices.a, self.preselected_vertices.a,
+                               out=self.preselected_vertices.a)
             if self.preselected_edges is not None:
-                self.preselected_edges.fa = np.logical_and(self.selected_edges.fa,
-                                                           self.preselected_edges.fa)
+                np.logical_and(self.selected_edges.a, self.preselected_edges.a,
+                               out=self.preselected_edges.a)
         else:
             self.selected_vertices.fa = False
             self.selected_edges.fa = False
             self.preselected_vertices = None
             self.preselected_edges = None
+        self._overlay_layers = None
         self.queue_draw()
 
     def button_press_event(self, widget, event):
@@ -1678,7 +1999,7 @@ class GraphEditorWidget(Gtk.DrawingArea):
                     if self.selected_vertices.fa.sum() > 1:
                         self.picked = self.selected_vertices
                     else:
-                        self.picked = next((v for v in self.g.vertices() if self.selected_vertices[v]), None)
+                        self.picked = self._first_selected_vertex()
                     self.emit("picked-changed")
                 self.srect = 2 * self.pointer
             else:
@@ -1686,12 +2007,13 @@ class GraphEditorWidget(Gtk.DrawingArea):
                     # place node
                     hit = self.g.add_vertex(1)
                     self.pos[hit] = self.pos_from_device(self.pointer)
+                    self._vertex_by_index[int(hit)] = hit
                     if self.vertex_matrix is not None:
                         self.vertex_matrix.add_vertex(hit)
                     geometry = (self.get_allocated_width(),
                                 self.get_allocated_height())
                     adjust_default_sizes(self.g, geometry, self.vprops, self.eprops, force=True)
-                    self.emit("graph-changed", True)
+                    self.emit("graph-changed", True, [("add", "v", int(hit))])
                 else:
                     hit = self.is_hit(self.pos_from_device(self.pointer))
                 if hit is not None:
@@ -1712,12 +2034,12 @@ class GraphEditorWidget(Gtk.DrawingArea):
                         u = GraphView(self.g, vfilt=self.selected_vertices)
                         saved_pos = u.own_property(self.pos).copy()
                         self.is_moving = (u, saved_pos, self.edit_mode == GraphEditorWidget.modes.place_node)
-                        self.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.FLEUR))
+                        self.get_window().set_cursor(self._cursor("FLEUR"))
                 else:
                     # pan
                     self.drag_vector = self.pointer
                     self.is_panning = True
-                    self.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.HAND2))
+                    self.get_window().set_cursor(self._cursor("HAND2"))
         elif event.button == 1 and state & Gdk.ModifierType.CONTROL_MASK:
             # ctrl zoom
             self.zrect = 2 * self.pointer
@@ -1730,11 +2052,15 @@ class GraphEditorWidget(Gtk.DrawingArea):
                     for v in u.vertices():
                         self.vertex_matrix.update_vertex(self.g.vertex(int(v)),
                                                          saved_pos[v])
+                    self._pos_array = None
                 else:
-                    for v in u.vertices():
-                        self.g.remove_vertex(v)
+                    # newly placed vertices are the last ones, no renumbering
+                    removed = [int(v) for v in u.vertices()]
+                    delta = [("remove", "v", i) for i in removed]
+                    self.g.remove_vertex(removed, fast=True)
                     self.init_vertex_matrix()
-                    self.emit("graph-changed", True)
+                    self.emit("graph-changed", True, delta)
+                    self.prepicked = None
                 self.is_moving = None
                 self.moved_picked = False
                 self.picked = None
@@ -1797,34 +2123,39 @@ class GraphEditorWidget(Gtk.DrawingArea):
                                                  (isinstance(self.picked, PropertyMap) and
                                                   self.picked.key_type() == 'e'))):
                     self.selected_vertices.fa = False
-                p1 = [self.srect[0], self.srect[1]]
-                p2 = [self.srect[2], self.srect[3]]
-                poly = [p1, [p1[0], p2[1]], p2, [p2[0], p1[1]]]
-                poly = [self.pos_from_device(x) for x in poly]
+                # test in widget space, where the rectangle is axis aligned even if view is rotated
+                corners = np.array(self.srect).reshape(2, 2)
+                xy = self.pos_to_device_batch(self._positions())
+                inside = ((xy >= corners.min(axis=0)) & (xy <= corners.max(axis=0))).all(axis=1)
 
                 before = self.selected_vertices.fa.sum()
-                self.vertex_matrix.mark_polygon(poly, self.selected_vertices)
+                np.logical_or(self.selected_vertices.a, inside, out=self.selected_vertices.a)
                 after = self.selected_vertices.fa.sum()
                 if after > 1:
                     self.picked = self.selected_vertices
                 else:
-                    self.picked = next((v for v in self.g.vertices() if self.selected_vertices[v]), None)
+                    self.picked = self._first_selected_vertex()
                 if before != after:
                     self.emit("picked-changed")
                 self.srect = None
             elif self.new_edge is not None:
                 hit = self.is_hit(self.pos_from_device((event.x, event.y)))
+                delta = []
                 if hit is not None:
-                    self.g.add_edge(self.new_edge[0], hit)
-                self.emit("graph-changed", True)
+                    edge = self.g.add_edge(self.new_edge[0], hit)
+                    i = int(self.g.edge_index[edge])
+                    self._edge_by_index[i] = edge
+                    delta.append(("add", "e", i))
+                self.emit("graph-changed", True, delta)
                 self.new_edge = None
             elif self.moved_picked:
                 self.drag_vector = None
-                self.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.ARROW))
+                self.get_window().set_cursor(self._cursor("ARROW"))
                 self.moved_picked = False
-                self.emit("graph-changed", True)
+                # only positions changed
+                self.emit("graph-changed", True, [])
             else:
-                self.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.ARROW))
+                self.get_window().set_cursor(self._cursor("ARROW"))
 
             self.queue_draw()
             self.is_moving = None
@@ -1846,38 +2177,53 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.pointer = [x, y]
 
         if state & Gdk.ModifierType.BUTTON1_MASK:
+            # rubber bands and new edge only need the area they sweep repainted
             if state & Gdk.ModifierType.CONTROL_MASK and self.zrect is not None:
+                old = list(self.zrect)
                 self.zrect[2:] = self.pointer
+                self.queue_draw_rects([old, self.zrect], pad=1)
+                return
             elif state & Gdk.ModifierType.SHIFT_MASK and self.srect is not None:
+                old = list(self.srect)
                 self.srect[2:] = self.pointer
+                self.queue_draw_rects([old, self.srect], pad=1)
+                return
             elif self.new_edge is not None:
+                source = list(self.pos_to_device(self.pos[self.new_edge[0]]))
+                old = list(self.pos_to_device(self.new_edge[1]))
                 self.new_edge[1] = self.pos_from_device(self.pointer)
+                pad = self.eprops.get("marker_size", _edefaults["marker_size"])
+                if isinstance(pad, PropertyMap):
+                    pad = pad.fa.max()
+                pad = np.hypot(*self.pos_to_device((pad, pad), dist=True)) + 1
+                self.queue_draw_rects([source + old, source + self.pointer], pad=pad)
+                return
             elif (self.is_moving is not None and self.picked is not None and
                     self.drag_vector != self.pointer):
                 p = self.pos_from_device(self.pointer)
                 if isinstance(self.picked, PropertyMap) and self.picked.key_type() == 'v':
                     c = self.pos_from_device(self.drag_vector)
-                    u = GraphView(self.g, vfilt=self.selected_vertices)
                     delta = np.asarray(p) - np.asarray(c)
-                    for v in u.vertices():
-                        new_pos = self.pos[v].a + delta
-                        self.vertex_matrix.update_vertex(self.g.vertex(int(v)),
-                                                         new_pos)
+                    self._translate_vertices(np.flatnonzero(self.selected_vertices.a), delta)
                 elif isinstance(self.picked, Vertex):
                     if self.vertex_matrix is not None:
                         self.vertex_matrix.update_vertex(self.picked, p)
                     else:
                         self.pos[self.picked] = p
+                    self._pos_array = None
                 self.drag_vector = self.pointer
                 self.moved_picked = True
-            elif self.is_panning:
+                self.overlay_dirty = True
+                self._overlay_record = None
+                self.queue_draw()
+            elif self.is_panning and self.drag_vector != self.pointer:
                 offset = [x - self.drag_vector[0],
                           y - self.drag_vector[1]]
                 m = cairo.Matrix()
                 m.translate(offset[0], offset[1])
                 self.smatrix = self.smatrix * m
                 self.drag_vector = self.pointer
-            self.queue_draw()
+                self.queue_draw()
 
     def scroll_event(self, widget, event):
         r"""Handle scrolling."""
@@ -1920,23 +2266,28 @@ class GraphEditorWidget(Gtk.DrawingArea):
                 self.tmatrix.translate(ncpos[0] - cpos[0],
                                        ncpos[1] - cpos[1])
 
-                self.position_parallel_edges()
-                self.lazy_regenerate = True
+                # surface is regenerated only once control points are updated too
+                self._schedule_parallel_edges()
         elif state & Gdk.ModifierType.SHIFT_MASK:
             # pan x
             m = cairo.Matrix()
             m.translate(dy * -10, 0)  # sensitivity
             self.smatrix = self.smatrix * m
+            self.queue_draw()
         else:
             hit = self.is_hit(self.pos_from_device(self.pointer))
             if (hit is not None and self.picked is not None and
                     (self.highlight[hit] or self.selected_vertices[hit])):
                     # HACK: due to self-loops all_edges != out_edges + in_edges
-                    hit_edge_pool = list(hit.out_edges())
-                    hit_edge_pool += [edge for edge in hit.in_edges() if edge not in hit_edge_pool]
+                    hit_edge_pool = {}  # keyed by edge index, in insertion order
+                    for edges in (hit.out_edges(), hit.in_edges()):
+                        for edge in edges:
+                            hit_edge_pool.setdefault(self.g.edge_index[edge], edge)
+                    indices = list(hit_edge_pool)
+                    hit_edge_pool = list(hit_edge_pool.values())
                     if len(hit_edge_pool) > 0:
-                        if self.picked in hit_edge_pool:
-                            i = hit_edge_pool.index(self.picked)
+                        if isinstance(self.picked, Edge) and self.g.edge_index[self.picked] in indices:
+                            i = indices.index(self.g.edge_index[self.picked])
                             i += 1 if dy > 0 else -1
                             i += len(hit_edge_pool)
                             i %= len(hit_edge_pool)
@@ -1955,8 +2306,7 @@ class GraphEditorWidget(Gtk.DrawingArea):
                 m = cairo.Matrix()
                 m.translate(0, dy * -10)  # sensitivity
                 self.smatrix = self.smatrix * m
-
-        self.queue_draw()
+                self.queue_draw()
 
     def key_press_event(self, widget, event):
         r"""Handle key press."""
@@ -1975,8 +2325,7 @@ class GraphEditorWidget(Gtk.DrawingArea):
         elif not self.is_moving and (event.keyval == 65507 or event.keyval == 65508):  # Ctrl
             if self.zrect is not None:
                 self.zrect[2:] = self.pointer
-            cursor = Gtk.Widget.render_icon(Gtk.Image(), Gtk.STOCK_ZOOM_IN, Gtk.IconSize.BUTTON)
-            self.get_window().set_cursor(Gdk.Cursor.new_from_pixbuf(self.get_display(), cursor, 0, 0))
+            self.get_window().set_cursor(self._cursor("ZOOM_IN"))
 
         self.queue_draw()
 
@@ -1987,7 +2336,7 @@ class GraphEditorWidget(Gtk.DrawingArea):
             return
 
         if not self.is_moving and (event.keyval == 65507 or event.keyval == 65508):  # Ctrl
-            self.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.ARROW))
+            self.get_window().set_cursor(self._cursor("ARROW"))
 
     # Touch gestures
 
@@ -2010,6 +2359,8 @@ class GraphEditorWidget(Gtk.DrawingArea):
         self.smatrix.translate(ncpos[0] - cpos[0],
                                ncpos[1] - cpos[1])
         scale_ink(zoom, self.vprops, self.eprops)
+        self._radii2_key = None
+        self._overlay_layers = None
         self.queue_draw()
 
     def rotate_begin(self, gesture, seq):
@@ -2059,17 +2410,21 @@ class GraphEditorWidget(Gtk.DrawingArea):
         marked = label_parallel_edges(self.g, mark_only=True)
 
         if "text" in self.eprops:
+            text = self.eprops["text"]
+            labels = {}  # non-empty labels of marked edges by their endpoints
             for edge in self.g.edges():
-                if marked[edge]:
-                    # supposed remaining won't get marked
-                    remaining = self.g.edge(edge.source(), edge.target())
-                    if self.eprops["text"][edge]:
-                        if self.eprops["text"][remaining]:
-                            self.eprops["text"][remaining] += label_sep + self.eprops["text"][edge]
-                        else:
-                            self.eprops["text"][remaining] = self.eprops["text"][edge]
+                if marked[edge] and text[edge]:
+                    labels.setdefault((edge.source(), edge.target()), []).append(text[edge])
+            for (source, target), parts in labels.items():
+                # supposed remaining won't get marked
+                remaining = self.g.edge(source, target)
+                if text[remaining]:
+                    parts.insert(0, text[remaining])
+                text[remaining] = label_sep.join(parts)
 
         remove_labeled_edges(self.g, marked)
+        # edges got renumbered, every cache and store is rebuilt
+        self.emit("graph-changed", True, None)
 
 
 # HACK: several changes
@@ -2079,20 +2434,24 @@ def adjust_default_sizes(g, geometry, vprops, eprops, force=False):
     if "size" not in vprops or force:
         area = geometry[0] * geometry[1]
         n = max(g.num_vertices(), 1)
-        size = np.sqrt(area / n) / 3.5
+        size = math.sqrt(area / n) / 3.5
         if "text" in vprops:
             font_size = vprops.get("font_size", _vdefaults["font_size"])
-            size = max(size, font_size if n == 1 else font_size * np.log10(n))
+            size = max(size, font_size if n == 1 else font_size * math.log10(n))
         vprops["size"] = size
+    elif "pen_width" in vprops and "pen_width" in eprops and "marker_size" in eprops:
+        # nothing left to derive from size
+        return
     elif isinstance(vprops["size"], PropertyMap):
         size = vprops["size"].fa.mean()
     else:
         size = vprops["size"]
 
+    pen_width = size / 10
     if "pen_width" not in vprops or force:
-        vprops["pen_width"] = size / 10
+        vprops["pen_width"] = pen_width
 
     if "pen_width" not in eprops or force:
-        eprops["pen_width"] = size / 10
+        eprops["pen_width"] = pen_width
     if "marker_size" not in eprops or force:
         eprops["marker_size"] = size * 0.6
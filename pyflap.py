@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 
+import threading
+import weakref
+
 from gtk_editor.gtk_editor import *
 
 # testing
@@ -7,94 +10,110 @@ from gtk_editor.gtk_editor import *
 
 def create_random_graph():
     g = Graph()
-    vprops_labels = g.new_vertex_property("string")
     g.add_vertex(100)
 
-    for i, node in enumerate(g.vertices()):
-        vprops_labels[node] = str(i)
-    g.vertex_properties["text"] = vprops_labels
+    # converted to labels in one go
+    g.vertex_properties["text"] = g.vertex_index.copy("string")
 
     # insert some random links
-    for s, t in zip(np.random.randint(0, 100, 100), np.random.randint(0, 100, 100)):
-        g.add_edge(g.vertex(s), g.vertex(t))
+    g.add_edge_list(np.random.default_rng().integers(0, 100, size=(100, 2)))
 
     pos = sfdp_layout(g)
 
     return g, pos
 
 
+# parallel edges and self-loops included on purpose
+_my_edges = np.array([[0, 1], [1, 2], [2, 2], [2, 2], [2, 1],
+                      [3, 2], [3, 2], [3, 1], [2, 3], [4, 2]])
+
+
 def create_my_graph():
     g = Graph()
-    vprops_labels = g.new_vertex_property("string")
     g.add_vertex(5)
 
-    for i, node in enumerate(g.vertices()):
-        vprops_labels[node] = str(i)
-    g.vertex_properties["text"] = vprops_labels
-
-    g.add_edge(0, 1)
-    g.add_edge(1, 2)
-    g.add_edge(2, 2)
-    g.add_edge(2, 2)
-    g.add_edge(2, 1)
-    g.add_edge(3, 2)
-    g.add_edge(3, 2)
-    g.add_edge(3, 1)
-    g.add_edge(2, 3)
-    g.add_edge(4, 2)
+    # converted to labels in one go
+    g.vertex_properties["text"] = g.vertex_index.copy("string")
+
+    g.add_edge_list(_my_edges)
 
     pos = sfdp_layout(g)
 
     return g, pos
 
 
-def add_some_graphs(target):
-    g, pos = create_random_graph()
-    target.add_new_tab(g, pos)
-
-    g, pos = create_random_graph()
-    target.add_new_tab(g, pos, "test_1.gml")
-    target.get_current_tab().emit("graph-changed", True)
-
+def create_partial_graph():
     g = Graph()
     v1, v2 = g.add_vertex(2)
     pos = g.new_vertex_property("vector<double>")
     pos[v1] = (10, 11)
-    target.add_new_tab(g, pos)
 
-    g, pos = create_my_graph()
-    target.add_new_tab(g, pos, "test_my.gml")
-    target.get_current_tab().emit("graph-changed", True)
+    return g, pos
+
+
+def add_graphs_in_background(target, jobs):
+    # each job is a (create, file_name, changed) tuple, graphs are created in worker threads but tabs are
+    # added in order of jobs, without switching pages, graph is only handed over to main loop once it's laid out
+    results = [None] * len(jobs)
+    next_job = 0
+
+    def add_ready_tabs():
+        nonlocal next_job
+        while next_job < len(jobs) and results[next_job] is not None:
+            create, file_name, changed = jobs[next_job]
+            graph, error = results[next_job]
+            next_job += 1
+            if error is not None:
+                print("Couldn't create graph '%s': %s" % (file_name, error), file=sys.stderr)
+                continue
+            tab = target.add_new_tab(*graph, file_name, switch=False)
+            if changed:
+                tab.emit("graph-changed", True, None)
+        return False
+
+    def work(i, create):
+        try:
+            result = (create(), None)
+        except Exception as error:
+            result = (None, error)
+
+        def post():
+            results[i] = result
+            return add_ready_tabs()
+
+        GLib.idle_add(post)
+
+    for i, (create, file_name, changed) in enumerate(jobs):
+        threading.Thread(target=work, args=(i, create), daemon=True).start()
+
+
+def add_some_graphs(target):
+    add_graphs_in_background(target, [(create_random_graph, None, False),
+                                      (create_random_graph, "test_1.gml", True),
+                                      (create_partial_graph, None, False),
+                                      (create_my_graph, "test_my.gml", True)])
 
 
 default_geometry = (800, 600)
-_window_list = []
+_window_list = weakref.WeakSet()  # closed windows drop out on their own
 window_title = "pyflap editor"
 
 
 def main():
     win = GraphEditorWindow(geometry=default_geometry, title=window_title)
-    _window_list.append(win)
+    _window_list.add(win)
 
     def destroy_callback(window, event):
 
         global _window_list
-        # return all(w.destroy() for w in _window_list)
-        # cancels event at first hiccup
-        all_destroyed = True
-        for w in _window_list:
-            if w.destroy():
-                all_destroyed = False
-        return not all_destroyed
-
-    def first_callback():
-        add_some_graphs(win)
-        return False
+        # a generator would stop destroying windows at first hiccup, list doesn't
+        return any([w.destroy() for w in list(_window_list)])
 
     win.connect("destroy", Gtk.main_quit)
     win.connect("delete-event", destroy_callback)
+    # layouts are computed in worker threads while window gets realized
+    add_some_graphs(win)
     win.show_all()
-    gobject.idle_add(first_callback)
 
     Gtk.main()
 